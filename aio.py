@@ -0,0 +1,81 @@
+"""Async database access for the concurrent detail views.
+
+With ``ASYNC_VIEWS`` set, ``show_venue`` and ``show_artist`` are async views
+that run their entity, genre and show queries at the same time through
+SQLAlchemy's asyncio extension (asyncpg on Postgres, aiosqlite on SQLite).
+Each concurrent query takes its own connection, as one connection can only
+run one statement at a time.
+
+Served through ``asgi.py`` these views run on the ASGI server's event loop,
+so a single worker keeps many requests in flight while they wait on the
+database, and connections are pooled per loop. Under the WSGI server Flask
+runs every async view in a new event loop, so nothing is pooled there.
+The engine takes the pool settings of ``SQLALCHEMY_ENGINE_OPTIONS`` and the
+``DB_STATEMENT_TIMEOUT`` of the synchronous one (see dbpool.py).
+"""
+
+import asyncio
+import weakref
+
+from flask import current_app
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+import dbpool
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# Event loop -> AsyncEngine; pooled connections belong to the loop they were
+# opened on.
+_engines = weakref.WeakKeyDictionary()
+
+
+def async_url(url):
+    """The async-driver equivalent of a synchronous database URL."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def engine():
+    loop = asyncio.get_running_loop()
+    async_engine = _engines.get(loop)
+    if async_engine is None:
+        config = current_app.config
+        url = config.get("ASYNC_DATABASE_URI") or async_url(
+            config["SQLALCHEMY_DATABASE_URI"]
+        )
+        options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+        if not config.get("ASYNC_SHARED_LOOP"):
+            options["poolclass"] = NullPool
+        sizing = ("pool_size", "max_overflow", "pool_timeout")
+        if options.get("poolclass") is NullPool:
+            for name in sizing:
+                options.pop(name, None)
+        elif any(name in options for name in sizing):
+            # aiosqlite would otherwise get a NullPool, which takes no sizes.
+            options.setdefault("poolclass", AsyncAdaptedQueuePool)
+        async_engine = _engines[loop] = create_async_engine(url, **options)
+        dbpool.apply_statement_timeout(
+            async_engine.sync_engine, config.get("DB_STATEMENT_TIMEOUT")
+        )
+    return async_engine
+
+
+async def fetch(statement):
+    async with engine().connect() as connection:
+        return (await connection.execute(statement)).all()
+
+
+async def fetch_all(*statements):
+    """Run ``statements`` concurrently; returns their rows in order."""
+    return await asyncio.gather(*(fetch(statement) for statement in statements))
+
+
+async def dispose():
+    for async_engine in list(_engines.values()):
+        await async_engine.dispose()
+    _engines.clear()
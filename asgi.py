@@ -0,0 +1,108 @@
+"""ASGI entry point: ``uvicorn asgi:application``.
+
+Requests routed to an async view (see ``ASYNC_VIEWS``) are dispatched on the
+server's event loop, so one worker serves many of them while they wait on the
+database. Everything else is handed to the WSGI app in a thread.
+"""
+
+import inspect
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import request_started
+from werkzeug.exceptions import HTTPException
+
+from app import create_app
+
+app = create_app()
+app.config["ASYNC_SHARED_LOOP"] = True
+wsgi = WsgiToAsgi(app)
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1").upper().replace("-", "_")
+        if name == "CONTENT_LENGTH":
+            continue  # Taken from the body read above.
+        key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+        value = value.decode("latin1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _dispatch(environ):
+    # Flask.full_dispatch_request, awaiting the view instead of running it
+    # in a new event loop.
+    with app.request_context(environ) as ctx:
+        try:
+            try:
+                request_started.send(app, _async_wrapper=app.ensure_sync)
+                rv = app.preprocess_request()
+                if rv is None:
+                    view = app.view_functions[ctx.request.url_rule.endpoint]
+                    rv = await view(**ctx.request.view_args)
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            return app.finalize_request(rv)
+        except Exception as e:
+            return app.handle_exception(e)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http":
+        adapter = app.url_map.bind("", url_scheme=scope.get("scheme", "http"))
+        try:
+            endpoint, _ = adapter.match(scope["path"], method=scope["method"])
+        except HTTPException:
+            endpoint = None
+        view = app.view_functions.get(endpoint)
+        if view is not None and inspect.iscoroutinefunction(view):
+            body = await _read_body(receive)
+            environ = _environ(scope, body)
+            response = await _dispatch(environ)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (name.lower().encode("latin1"), value.encode("latin1"))
+                        for name, value in response.headers.items()
+                    ],
+                }
+            )
+            for chunk in response.iter_encoded():
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+            return
+    await wsgi(scope, receive, send)
@@ -0,0 +1,258 @@
+"""Bundled, fingerprinted and precompressed static assets.
+
+``flask fyyur assets`` builds ``static/dist``. It concatenates the
+``BUNDLES`` (minifying the CSS), then copies every bundle and every file
+under ``static/`` to a name carrying a hash of its content. Text files also
+get ``.gz`` siblings, and ``.br`` ones when the ``brotli`` package is
+installed. ``manifest.json`` maps logical names (paths under ``static/``, or
+bundle names) to the built files.
+
+At runtime the ``asset_url`` and ``asset_urls`` template functions resolve
+logical names through the manifest. ``/assets/<name>`` serves the built files
+with a far-future ``Cache-Control`` and the best encoding the client accepts.
+A name changes whenever its content does, so browsers never need to
+revalidate. Without a manifest the templates link the source files through
+the ``static`` route instead; that happens before the first build, or with
+``ASSETS_BUNDLED`` off, as in development.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+
+from flask import abort, request, send_from_directory, url_for
+
+# Logical bundle name -> source files under static/, in load order.
+BUNDLES = {
+    "app.css": [
+        "css/bootstrap.min.css",
+        "css/layout.main.css",
+        "css/main.css",
+        "css/main.responsive.css",
+        "css/main.quickfix.css",
+    ],
+    # Loaded synchronously in <head>.
+    "head.js": ["js/libs/modernizr-2.8.2.min.js", "js/libs/moment.min.js"],
+    # Loaded with defer at the end of <body>, after jQuery.
+    "app.js": [
+        "js/script.js",
+        "js/libs/bootstrap-3.1.1.min.js",
+        "js/plugins.js",
+    ],
+}
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+
+# Worth precompressing; images and woff fonts are compressed already.
+COMPRESSIBLE = {".css", ".js", ".map", ".svg", ".ttf", ".eot", ".otf", ".json"}
+
+# Content-Encoding -> file suffix, preferred first.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_CSS_COMMENT = re.compile(r"/\*(?!!).*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{};,>])\s*")
+_SOURCE_MAP = re.compile(r"^\s*//[#@] sourceMappingURL=.*$", re.M)
+
+
+def minify_css(text):
+    """Drop comments (but not /*! licences) and redundant whitespace."""
+    text = _CSS_COMMENT.sub("", text)
+    text = re.sub(r"\s+", " ", text)
+    text = _CSS_SPACE.sub(r"\1", text)
+    return text.replace(";}", "}").strip()
+
+
+def _fingerprint(name, content):
+    root, ext = posixpath.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def _rebase_urls(css, source, target_dir, built, static_url):
+    """Rewrite the relative url()s of ``source`` (a path under static/) for a
+    copy in ``target_dir`` (a path under dist/): to the built file where there
+    is one, otherwise to the source file under ``static_url``.
+    """
+
+    def rebase(match):
+        quote, url = match.groups()
+        if url.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        path, suffix = re.match(r"([^?#]*)(.*)", url).groups()
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+        if path in built:
+            path = posixpath.relpath(built[path], target_dir or ".")
+        else:
+            path = f"{static_url}/{path}"
+        return f"url({quote}{path}{suffix}{quote})"
+
+    return _CSS_URL.sub(rebase, css)
+
+
+def _compress(content):
+    yield "gzip", gzip.compress(content, 9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return
+    yield "br", brotli.compress(content)
+
+
+def _write(dist, name, content):
+    """Write a built file and its compressed siblings; returns the encodings
+    written. Existing files are kept, their name says they are current.
+    """
+    path = os.path.join(dist, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(content)
+    if posixpath.splitext(name)[1] not in COMPRESSIBLE:
+        return []
+    encodings = []
+    for encoding, compressed in _compress(content):
+        if len(compressed) >= len(content):
+            continue
+        encoded = path + ENCODINGS[encoding]
+        if not os.path.exists(encoded):
+            with open(encoded, "wb") as f:
+                f.write(compressed)
+        encodings.append(encoding)
+    return encodings
+
+
+def _sources(static_folder):
+    names = []
+    for root, dirs, files in os.walk(static_folder):
+        rel = os.path.relpath(root, static_folder).replace(os.sep, "/")
+        if rel == DIST:
+            dirs[:] = []
+            continue
+        names.extend(posixpath.normpath(posixpath.join(rel, f)) for f in files)
+    # Stylesheets last, so the files they reference are built first.
+    return sorted(names, key=lambda name: (name.endswith(".css"), name))
+
+
+def build(static_folder, static_url="/static", clean=False):
+    """Build ``static_folder``/dist and its manifest; returns the manifest.
+
+    ``static_url`` is where the source files are served, for stylesheet
+    references to files that are not built.
+    """
+    dist = os.path.join(static_folder, DIST)
+    if clean:
+        shutil.rmtree(dist, ignore_errors=True)
+    built = {}
+    encodings = {}
+
+    def read(name):
+        with open(os.path.join(static_folder, name), "rb") as f:
+            return f.read()
+
+    def emit(name, content):
+        built[name] = _fingerprint(name, content)
+        encodings[built[name]] = _write(dist, built[name], content)
+
+    for name in _sources(static_folder):
+        content = read(name)
+        if name.endswith(".css"):
+            css = content.decode("utf-8")
+            css = _rebase_urls(css, name, posixpath.dirname(name), built, static_url)
+            content = css.encode("utf-8")
+        emit(name, content)
+
+    for bundle, names in BUNDLES.items():
+        parts = [read(name).decode("utf-8") for name in names]
+        if bundle.endswith(".css"):
+            content = "\n".join(
+                minify_css(_rebase_urls(part, name, "", built, static_url))
+                for part, name in zip(parts, names)
+            )
+        else:
+            content = "\n;\n".join(_SOURCE_MAP.sub("", part) for part in parts)
+        emit(bundle, content.encode("utf-8"))
+
+    manifest = {"assets": built, "encodings": encodings}
+    # Replaced in one step, so workers never read half a manifest.
+    os.makedirs(dist, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=dist, delete=False) as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, os.path.join(dist, MANIFEST))
+    return manifest
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.built = {}
+        self.encodings = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["assets"] = self
+        self.dist = os.path.join(app.static_folder, DIST)
+        self.max_age = app.config.get("ASSETS_MAX_AGE", 365 * 24 * 3600)
+        self.built = {}
+        self.encodings = {}
+        if app.config.get("ASSETS_BUNDLED", True):
+            self.load()
+        app.add_url_rule("/assets/<path:filename>", "assets", self.serve)
+        app.add_template_global(self.url, "asset_url")
+        app.add_template_global(self.urls, "asset_urls")
+
+    def load(self):
+        """Read the manifest written by ``build``, if there is one."""
+        try:
+            with open(os.path.join(self.dist, MANIFEST)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        self.built = manifest["assets"]
+        self.encodings = manifest["encodings"]
+
+    def url(self, name):
+        """URL of the file at ``name`` under static/, or of a bundle."""
+        if name in self.built:
+            return url_for("assets", filename=self.built[name])
+        return url_for("static", filename=name)
+
+    def urls(self, name):
+        """URLs to load for ``name``: the built bundle, or its sources when
+        there is no build.
+        """
+        if name in self.built or name not in BUNDLES:
+            return [self.url(name)]
+        return [url_for("static", filename=source) for source in BUNDLES[name]]
+
+    def serve(self, filename):
+        if filename not in self.encodings:
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = next(
+            (
+                encoding
+                for encoding in ENCODINGS
+                if encoding in self.encodings[filename]
+                and request.accept_encodings[encoding]
+            ),
+            None,
+        )
+        path = filename + ENCODINGS[encoding] if encoding else filename
+        response = send_from_directory(
+            self.dist, path, mimetype=mimetype, max_age=self.max_age
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if self.encodings[filename]:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
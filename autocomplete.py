@@ -0,0 +1,176 @@
+"""In-process prefix index of venue and artist names for type-ahead.
+
+Each kind keeps a sorted list of normalized keys (the name and every word
+suffix of it, so "note" finds "The Blue Note") with a parallel list of
+``(id, name)`` values. A lookup bisects to the first key at or after the
+typed prefix and walks forward, so it never touches the database.
+
+The index of a kind is loaded from the database on its first lookup. The
+create, edit and delete handlers then update it in place, but only in their
+own worker; every ``AUTOCOMPLETE_REBUILD_INTERVAL`` seconds a lookup starts a
+reload in a background thread, which brings in changes made by other workers
+and by ``flask fyyur import``. The stale index keeps answering meanwhile.
+"""
+
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Venue, Artist
+
+MODELS = {"venue": Venue, "artist": Artist}
+
+
+def normalize(text):
+    """Casefolded, accent-free, single-spaced ``text``."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+def _keys(name):
+    words = normalize(name).split(" ")
+    return [" ".join(words[start:]) for start in range(len(words)) if words[start]]
+
+
+class PrefixIndex:
+    def __init__(self, entries=()):
+        """Index ``entries``, ``(id, name)`` pairs."""
+        entries = list(entries)
+        pairs = sorted(
+            (key, entity_id, name) for entity_id, name in entries for key in _keys(name)
+        )
+        self.keys = [key for key, _, _ in pairs]
+        self.values = [(entity_id, name) for _, entity_id, name in pairs]
+        self.names = {entity_id: name for entity_id, name in entries}
+
+    def add(self, entity_id, name):
+        self.remove(entity_id)
+        self.names[entity_id] = name
+        for key in _keys(name):
+            position = bisect_left(self.keys, key)
+            # Keep keys and values aligned: insert both at the same place.
+            while (
+                position < len(self.keys)
+                and self.keys[position] == key
+                and self.values[position][0] < entity_id
+            ):
+                position += 1
+            self.keys.insert(position, key)
+            self.values.insert(position, (entity_id, name))
+
+    def remove(self, entity_id):
+        name = self.names.pop(entity_id, None)
+        if name is None:
+            return
+        for key in _keys(name):
+            position = bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key:
+                if self.values[position][0] == entity_id:
+                    del self.keys[position]
+                    del self.values[position]
+                    break
+                position += 1
+
+    def search(self, prefix, limit=10):
+        """Up to ``limit`` ``(id, name)`` pairs whose name, or a word in it,
+        starts with ``prefix``, in order of the matching text.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        position = bisect_left(self.keys, prefix)
+        matches = {}
+        while (
+            len(matches) < limit
+            and position < len(self.keys)
+            and self.keys[position].startswith(prefix)
+        ):
+            entity_id, name = self.values[position]
+            matches.setdefault(entity_id, name)
+            position += 1
+        return list(matches.items())
+
+    def __len__(self):
+        return len(self.names)
+
+
+class Autocomplete:
+    def __init__(self):
+        self.indexes = {}
+        self.built_at = {}
+        self._lock = threading.Lock()
+        # Kind -> changes made while its rebuild was loading, replayed on the
+        # new index.
+        self._rebuilding = {}
+
+    def init_app(self, app):
+        app.extensions["autocomplete"] = self
+        self.limit = app.config.get("AUTOCOMPLETE_LIMIT", 10)
+        self.interval = app.config.get("AUTOCOMPLETE_REBUILD_INTERVAL", 300)
+        self.indexes = {}
+        self.built_at = {}
+
+    def _load(self, kind):
+        model = MODELS[kind]
+        return PrefixIndex(db.session.execute(select(model.id, model.name)).tuples())
+
+    def _rebuild(self, app, kind):
+        try:
+            with app.app_context():
+                index = self._load(kind)
+        except Exception as e:
+            app.logger.warning("Rebuilding the %s autocomplete failed: %s", kind, e)
+            index = None
+        with self._lock:
+            changes = self._rebuilding.pop(kind)
+            if index is not None:
+                for change, args in changes:
+                    getattr(index, change)(*args)
+                self.indexes[kind] = index
+                self.built_at[kind] = time.monotonic()
+
+    def index(self, kind):
+        with self._lock:
+            index = self.indexes.get(kind)
+            if index is not None:
+                due = time.monotonic() - self.built_at[kind] >= self.interval
+                if not self.interval or not due or kind in self._rebuilding:
+                    return index
+                self._rebuilding[kind] = []
+        if index is not None:
+            app = current_app._get_current_object()
+            threading.Thread(
+                target=self._rebuild, args=(app, kind), daemon=True
+            ).start()
+            return index
+        index = self._load(kind)
+        with self._lock:
+            self.indexes.setdefault(kind, index)
+            self.built_at.setdefault(kind, time.monotonic())
+            return self.indexes[kind]
+
+    def search(self, kind, prefix, limit=None):
+        index = self.index(kind)
+        with self._lock:
+            return index.search(prefix, limit or self.limit)
+
+    def _change(self, kind, change, *args):
+        with self._lock:
+            index = self.indexes.get(kind)
+            if index is None:
+                return
+            getattr(index, change)(*args)
+            if kind in self._rebuilding:
+                self._rebuilding[kind].append((change, args))
+
+    def add(self, kind, entity_id, name):
+        """Index a created or renamed entity; a no-op until its kind is loaded."""
+        self._change(kind, "add", entity_id, name)
+
+    def remove(self, kind, entity_id):
+        self._change(kind, "remove", entity_id)
@@ -0,0 +1,5 @@
+"""Route benchmarks against a seeded synthetic dataset.
+
+Run ``python -m benchmarks --shows 100000 -o results.json``; see
+``benchmarks/run.py`` for the options.
+"""
@@ -0,0 +1,270 @@
+"""Seeded synthetic venues, artists and shows.
+
+The same seed and sizes always produce the same rows, so runs on different
+commits measure the same data. Distributions are skewed the way real listings
+are: a few states and genres hold most of the rows, and a few venues and
+artists book most of the shows.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from forms import GENRES, STATES
+from models import db, Venue, Artist, Genre, shows_list, venue_genres, artist_genres
+from booking import show_duration
+import summary
+
+BATCH_SIZE = 5000
+
+ADJECTIVES = [
+    "Blue",
+    "Golden",
+    "Velvet",
+    "Electric",
+    "Silver",
+    "Crimson",
+    "Hidden",
+    "Rusty",
+    "Neon",
+    "Wild",
+    "Quiet",
+    "Lucky",
+    "Broken",
+    "Midnight",
+    "Little",
+]
+NOUNS = [
+    "Room",
+    "Lounge",
+    "Hall",
+    "Cellar",
+    "Garden",
+    "Theatre",
+    "Tavern",
+    "Club",
+    "Barn",
+    "Palace",
+    "Parlor",
+    "Warehouse",
+    "Stage",
+    "Den",
+    "Attic",
+]
+FIRST_NAMES = [
+    "Guns",
+    "Matt",
+    "Ada",
+    "Nina",
+    "Otis",
+    "Ray",
+    "Etta",
+    "Miles",
+    "June",
+    "Lou",
+    "Patti",
+    "Sam",
+    "Billie",
+    "Joni",
+    "Duke",
+]
+LAST_NAMES = [
+    "Quevado",
+    "Parker",
+    "Simone",
+    "Redding",
+    "Charles",
+    "James",
+    "Davis",
+    "Carter",
+    "Reed",
+    "Smith",
+    "Cooke",
+    "Holiday",
+    "Mitchell",
+    "Ellington",
+    "Petty",
+]
+CITIES = {
+    "CA": ["San Francisco", "Los Angeles", "Oakland"],
+    "NY": ["New York", "Brooklyn", "Buffalo"],
+    "TX": ["Austin", "Houston", "Dallas"],
+    "TN": ["Nashville", "Memphis"],
+    "IL": ["Chicago"],
+    "LA": ["New Orleans"],
+    "WA": ["Seattle"],
+}
+
+
+def _weights(count, skew=1.1):
+    # Zipf-like: the n-th item is picked about 1 / n**skew as often.
+    return [1 / (rank**skew) for rank in range(1, count + 1)]
+
+
+class Generator:
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        states = list(STATES)
+        genres = list(GENRES)
+        self.random.shuffle(states)
+        self.random.shuffle(genres)
+        # Keep the states that have city names at the head of the distribution.
+        self.states = [s for s in CITIES if s in states] + [
+            s for s in states if s not in CITIES
+        ]
+        self.genres = genres
+        self.state_weights = _weights(len(self.states))
+        self.genre_weights = _weights(len(self.genres), 0.8)
+
+    def name(self, index, people=False):
+        if people:
+            words = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+        else:
+            words = "The", self.random.choice(ADJECTIVES), self.random.choice(NOUNS)
+        # The index keeps names unique, which the show importer relies on.
+        return f"{' '.join(words)} {index}"
+
+    def place(self):
+        state = self.random.choices(self.states, self.state_weights)[0]
+        city = self.random.choice(CITIES.get(state, [f"{state} City"]))
+        return city, state
+
+    def pick_genres(self):
+        count = self.random.choices([1, 2, 3], [0.5, 0.35, 0.15])[0]
+        picked = set()
+        while len(picked) < count:
+            picked.add(self.random.choices(self.genres, self.genre_weights)[0])
+        return sorted(picked)
+
+    def phone(self):
+        r = self.random.randint
+        return f"{r(200, 999)}-{r(200, 999)}-{r(1000, 9999)}"
+
+    def venue(self, index):
+        city, state = self.place()
+        return {
+            "name": self.name(index),
+            "city": city,
+            "state": state,
+            "address": f"{self.random.randint(1, 9999)} Main Street",
+            "phone": self.phone(),
+            "image_link": f"https://images.example.com/venues/{index}.jpg",
+            "facebook_link": f"https://www.facebook.com/venue{index}",
+            "website_link": f"https://venue{index}.example.com",
+            "is_looking_for_talent": self.random.random() < 0.3,
+            "seeking_description": None,
+        }
+
+    def artist(self, index):
+        city, state = self.place()
+        return {
+            "name": self.name(index, people=True),
+            "city": city,
+            "state": state,
+            "phone": self.phone(),
+            "image_link": f"https://images.example.com/artists/{index}.jpg",
+            "facebook_link": f"https://www.facebook.com/artist{index}",
+            "website_link": f"https://www.facebook.com/artist{index}",
+            "is_looking_for_venues": self.random.random() < 0.3,
+            "seeking_description": None,
+        }
+
+    def shows(self, venue_ids, artist_ids, count, now, duration):
+        """Yield ``count`` shows that do not overlap at a venue or for an
+        artist.
+
+        Shows start on a grid of ``duration`` slots spread over a year either
+        side of ``now``; a venue or artist is booked at most once per slot.
+        """
+        slots = int(timedelta(days=365) / duration)
+        count = min(count, len(venue_ids) * 2 * slots, len(artist_ids) * 2 * slots)
+        venue_weights = _weights(len(venue_ids), 0.6)
+        artist_weights = _weights(len(artist_ids), 0.6)
+        start = now.replace(minute=0, second=0, microsecond=0)
+        booked = set()
+        made = 0
+        while made < count:
+            batch = min(BATCH_SIZE, count - made)
+            picks = zip(
+                self.random.choices(venue_ids, venue_weights, k=batch),
+                self.random.choices(artist_ids, artist_weights, k=batch),
+                (self.random.randint(-slots, slots - 1) for _ in range(batch)),
+            )
+            for venue_id, artist_id, slot in picks:
+                if ("venue", venue_id, slot) in booked:
+                    continue
+                if ("artist", artist_id, slot) in booked:
+                    continue
+                booked.add(("venue", venue_id, slot))
+                booked.add(("artist", artist_id, slot))
+                made += 1
+                yield {
+                    "venue_id": venue_id,
+                    "artist_id": artist_id,
+                    "start_time": start + slot * duration,
+                    "end_time": start + (slot + 1) * duration,
+                }
+
+
+def _batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load(venues, artists, shows, seed=0, now=None):
+    """Insert the dataset into an empty database.
+
+    Returns the venue ids and the artist ids.
+    """
+    generator = Generator(seed)
+    now = now or datetime.now()
+    connection = db.session.connection()
+    genres = Genre.__table__
+    rows = connection.execute(
+        insert(genres).returning(genres.c.name, genres.c.id),
+        [{"name": name} for name in GENRES],
+    )
+    genre_ids = {name: genre_id for name, genre_id in rows}
+
+    ids = []
+    for model, link, make, count in (
+        (Venue, venue_genres, generator.venue, venues),
+        (Artist, artist_genres, generator.artist, artists),
+    ):
+        table = model.__table__
+        owner = link.c[0].name
+        entity_ids = []
+        for batch in _batches(make(index) for index in range(1, count + 1)):
+            new_ids = (
+                connection.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                    batch,
+                )
+                .scalars()
+                .all()
+            )
+            connection.execute(
+                insert(link),
+                [
+                    {owner: entity_id, "genre_id": genre_ids[genre]}
+                    for entity_id in new_ids
+                    for genre in generator.pick_genres()
+                ],
+            )
+            entity_ids.extend(new_ids)
+        ids.append(entity_ids)
+    venue_ids, artist_ids = ids
+
+    rows = generator.shows(venue_ids, artist_ids, shows, now, show_duration())
+    for batch in _batches(rows):
+        connection.execute(insert(shows_list), batch)
+    summary.rebuild(now)
+    db.session.commit()
+    return venue_ids, artist_ids
@@ -0,0 +1,384 @@
+"""Drive every route through the Flask test client and report to JSON.
+
+Usage::
+
+    python -m benchmarks --venues 1000 --artists 2000 --shows 100000 \\
+        --database sqlite:////tmp/fyyur-bench.db -o results.json
+
+The database is rebuilt from the migrations and loaded with the seeded
+dataset unless ``--reuse`` is given (the dataset must then match the sizes).
+Each route is requested ``--requests`` times after a short warm-up; the
+report has p50/p95/p99/mean latency in milliseconds, queries per request
+and the peak memory allocated while serving one request. The page cache is
+off unless ``--cache`` is given, so detail pages measure the database path.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _rebuild_schema(app, db, uri):
+    from flask_migrate import downgrade, upgrade
+    from sqlalchemy import inspect
+
+    directory = os.path.join(ROOT, "migrations")
+    with app.app_context():
+        if uri.startswith("sqlite:///") and uri != "sqlite://":
+            db.engine.dispose()
+            path = uri[len("sqlite:///") :]
+            if os.path.exists(path):
+                os.remove(path)
+        elif inspect(db.engine).has_table("alembic_version"):
+            downgrade(directory=directory, revision="base")
+        upgrade(directory=directory)
+
+
+class Scenarios:
+    """Request factories, one per route, drawing from the loaded dataset."""
+
+    def __init__(self, seed, venue_ids, artist_ids, first_show):
+        from forms import GENRES, STATES
+
+        self.random = random.Random(seed)
+        self.venue_ids = venue_ids
+        self.artist_ids = artist_ids
+        # Shows created by the run go after every existing one, a day apart,
+        # so they never overlap another show.
+        self.next_show = first_show
+        self.genres = GENRES
+        self.states = STATES
+        self.created = 0
+        self.created_venues = []
+
+    def term(self):
+        return self.random.choice(
+            ["Blue", "Hall", "lounge", "Parker", "Nina", "The", "7", "Cellar 1"]
+        )
+
+    def venue_form(self, name="Benchmark Venue"):
+        self.created += 1
+        return {
+            "name": f"{name} {self.created}",
+            "city": "San Francisco",
+            "state": self.random.choice(self.states),
+            "address": "1 Main Street",
+            "phone": "415-555-0100",
+            "genres": self.random.sample(self.genres, 2),
+            "image_link": "https://images.example.com/venue.jpg",
+            "facebook_link": "https://www.facebook.com/benchmark",
+            "website_link": "https://benchmark.example.com",
+            "seeking_description": "",
+        }
+
+    def artist_form(self, name="Benchmark Artist"):
+        self.created += 1
+        return {
+            "name": f"{name} {self.created}",
+            "city": "Austin",
+            "state": self.random.choice(self.states),
+            "phone": "512-555-0100",
+            "genres": self.random.sample(self.genres, 1),
+            "image_link": "https://images.example.com/artist.jpg",
+            "facebook_link": "https://www.facebook.com/benchmark",
+            "website_link": "https://www.facebook.com/benchmark",
+            "seeking_description": "",
+        }
+
+    def show_form(self):
+        start_time = self.next_show
+        self.next_show += timedelta(days=1)
+        return {
+            "venue_id": self.venue(),
+            "artist_id": self.artist(),
+            "start_time": start_time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def tour_form(self, dates=40):
+        lines = []
+        for _ in range(dates):
+            start_time = self.next_show
+            self.next_show += timedelta(days=1)
+            lines.append(f"{self.venue()}, {start_time:%Y-%m-%d %H:%M:%S}")
+        return {"artist_id": self.artist(), "dates": "\n".join(lines), "mode": "all"}
+
+    def venue(self):
+        return self.random.choice(self.venue_ids)
+
+    def artist(self):
+        return self.random.choice(self.artist_ids)
+
+    def routes(self):
+        """``(name, factory)`` pairs; a factory returns ``(method, path, data)``.
+
+        ``data`` is the query string for GET requests and the form otherwise.
+        """
+        r = self.random
+        return [
+            ("index", lambda: ("GET", "/", None)),
+            ("venues", lambda: ("GET", "/venues", None)),
+            (
+                "venues_filtered",
+                lambda: (
+                    "GET",
+                    "/venues",
+                    {"genre": r.choice(self.genres), "state": r.choice(self.states)},
+                ),
+            ),
+            ("artists", lambda: ("GET", "/artists", None)),
+            ("shows", lambda: ("GET", "/shows", None)),
+            ("shows_all", lambda: ("GET", "/shows?view=all", None)),
+            ("show_venue", lambda: ("GET", f"/venues/{self.venue()}", None)),
+            ("show_artist", lambda: ("GET", f"/artists/{self.artist()}", None)),
+            (
+                "search_venues",
+                lambda: ("POST", "/venues/search", {"search_term": self.term()}),
+            ),
+            (
+                "search_artists",
+                lambda: ("POST", "/artists/search", {"search_term": self.term()}),
+            ),
+            (
+                "search_shows",
+                lambda: ("POST", "/shows/search", {"search_term": self.term()}),
+            ),
+            (
+                "autocomplete",
+                lambda: (
+                    "GET",
+                    "/api/autocomplete",
+                    {"type": r.choice(["venue", "artist"]), "q": self.term()[:3]},
+                ),
+            ),
+            ("edit_venue", lambda: ("GET", f"/venues/{self.venue()}/edit", None)),
+            ("edit_artist", lambda: ("GET", f"/artists/{self.artist()}/edit", None)),
+            ("create_venue_form", lambda: ("GET", "/venues/create", None)),
+            ("create_artist_form", lambda: ("GET", "/artists/create", None)),
+            ("create_shows", lambda: ("GET", "/shows/create", None)),
+            ("export_venues", lambda: ("GET", "/export/venues", None)),
+            ("metrics", lambda: ("GET", "/metrics", None)),
+            (
+                "edit_venue_submission",
+                lambda: (
+                    "POST",
+                    f"/venues/{self.venue()}/edit",
+                    self.venue_form("Edited Venue"),
+                ),
+            ),
+            (
+                "edit_artist_submission",
+                lambda: (
+                    "POST",
+                    f"/artists/{self.artist()}/edit",
+                    self.artist_form("Edited Artist"),
+                ),
+            ),
+            (
+                "create_venue_submission",
+                lambda: ("POST", "/venues/create", self.venue_form()),
+            ),
+            (
+                "create_artist_submission",
+                lambda: ("POST", "/artists/create", self.artist_form()),
+            ),
+            (
+                "create_show_submission",
+                lambda: ("POST", "/shows/create", self.show_form()),
+            ),
+            (
+                "create_tour_submission",
+                lambda: ("POST", "/shows/tour", self.tour_form()),
+            ),
+            (
+                "delete_venue",
+                lambda: ("DELETE", f"/venues/{self.created_venues.pop()}", None),
+            ),
+        ]
+
+
+def _open(client, method, path, data):
+    if method == "GET":
+        return client.open(path, method=method, query_string=data)
+    return client.open(path, method=method, data=data)
+
+
+def measure(client, factory, requests, warmup):
+    from querycheck import query_budget
+
+    latencies, queries, statuses = [], [], {}
+    for _ in range(warmup):
+        method, path, data = factory()
+        _open(client, method, path, data).get_data()
+    for _ in range(requests):
+        method, path, data = factory()
+        with query_budget(float("inf")) as budget:
+            started = time.perf_counter()
+            response = _open(client, method, path, data)
+            response.get_data()
+            elapsed = time.perf_counter() - started
+        latencies.append(elapsed * 1000)
+        queries.append(budget[1])
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    method, path, data = factory()
+    tracemalloc.start()
+    _open(client, method, path, data).get_data()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "queries_mean": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--venues", type=int, default=1000)
+    parser.add_argument("--artists", type=int, default=1000)
+    parser.add_argument("--shows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--database",
+        default="sqlite:////tmp/fyyur-bench.db",
+        help="SQLAlchemy URL; the database is wiped unless --reuse is given",
+    )
+    parser.add_argument("--reuse", action="store_true")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--only", nargs="*", help="route names to run")
+    parser.add_argument("--skip", nargs="*", default=[], help="route names to skip")
+    parser.add_argument("-o", "--output", help="JSON file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, ROOT)
+
+    from app import create_app
+    from config import ProductionConfig
+    from models import db, Venue, Artist, shows_list
+
+    class BenchmarkConfig(ProductionConfig):
+        SECRET_KEY = "benchmark"
+        SQLALCHEMY_DATABASE_URI = args.database
+        WTF_CSRF_ENABLED = False
+        CACHE_BACKEND = "memory" if args.cache else "null"
+
+    app = create_app(BenchmarkConfig)
+
+    app.logger.disabled = True
+    started = time.perf_counter()
+    if not args.reuse:
+        _rebuild_schema(app, db, args.database)
+        with app.app_context():
+            from benchmarks.generate import load
+
+            venue_ids, artist_ids = load(
+                args.venues, args.artists, args.shows, args.seed
+            )
+    else:
+        with app.app_context():
+            venue_ids = list(db.session.scalars(db.select(Venue.id)))
+            artist_ids = list(db.session.scalars(db.select(Artist.id)))
+    load_seconds = time.perf_counter() - started
+    with app.app_context():
+        last_show = db.session.scalar(db.select(db.func.max(shows_list.c.start_time)))
+    first_show = (last_show or datetime.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+
+    scenarios = Scenarios(args.seed, venue_ids, artist_ids, first_show)
+    client = app.test_client()
+    results = {}
+    for name, factory in scenarios.routes():
+        if args.only and name not in args.only or name in args.skip:
+            continue
+        if name == "delete_venue":
+            # Only delete venues this run created, so the dataset stays put.
+            with app.app_context():
+                scenarios.created_venues = list(
+                    db.session.scalars(
+                        db.select(Venue.id).where(
+                            Venue.name.startswith("Benchmark Venue")
+                        )
+                    )
+                )
+            if len(scenarios.created_venues) < args.requests + args.warmup + 1:
+                continue
+        results[name] = measure(client, factory, args.requests, args.warmup)
+        print(
+            f"{name:26} p50 {results[name]['p50_ms']:9.2f} ms  "
+            f"p99 {results[name]['p99_ms']:9.2f} ms  "
+            f"queries {results[name]['queries_mean']:6.1f}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "commit": _commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": args.database.split(":", 1)[0],
+        "dataset": {
+            "venues": args.venues,
+            "artists": args.artists,
+            "shows": args.shows,
+            "seed": args.seed,
+        },
+        "cache": args.cache,
+        "load_seconds": round(load_seconds, 2),
+        # ru_maxrss is KiB on Linux.
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "routes": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
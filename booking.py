@@ -0,0 +1,243 @@
+"""Show booking rules.
+
+A show occupies its venue and its artist from ``start_time`` to
+``end_time``, which new shows get from ``SHOW_DURATION``. Neither may be
+booked twice at once. On Postgres this is enforced by exclusion constraints
+over ``tsrange(start_time, end_time)``; elsewhere ``check_show`` is the only
+guard. ``check_show`` checks the venue and artist exist and the window is free
+for both in one query, before anything is written. Its overlap test uses
+the ``(venue_id, start_time)`` and ``(artist_id, start_time)`` indexes. An
+overlapping show must start less than one ``SHOW_DURATION`` before the new one,
+which assumes no show is longer than the current setting.
+
+``check_batch`` checks many shows at once, for ``book_tour`` and the bulk
+importer: one query looks up the existing shows clashing with any of them,
+and the shows are checked against each other in Python. ``book_tour`` books
+many dates for one artist: it checks the venues and the artist with one
+query, the dates with ``check_batch``, and inserts the accepted shows with a
+multi-row ``INSERT``, which returns their ids in order.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, func, literal, or_, select, union_all
+
+from models import db, Venue, Artist, shows_list
+
+OWNERS = ("venue", "artist")
+
+# Shows per clash query; each adds two OR-ed windows of four parameters.
+CLASH_CHUNK_SIZE = 500
+
+
+def show_duration():
+    return timedelta(seconds=current_app.config["SHOW_DURATION"])
+
+
+def _taken(owner, start_time):
+    return f"The {owner} already has a show at {start_time:%Y-%m-%d %H:%M}."
+
+
+def _clash(column, entity_id, start_time, end_time):
+    """Start of the first show of ``entity_id`` overlapping the window."""
+    return (
+        select(func.min(shows_list.c.start_time))
+        .where(
+            column == entity_id,
+            shows_list.c.start_time < end_time,
+            shows_list.c.start_time > start_time - show_duration(),
+            shows_list.c.end_time > start_time,
+        )
+        .scalar_subquery()
+    )
+
+
+def check_show(show):
+    """Problems that would stop ``show`` (a ``shows`` row as a dict) from being
+    booked, as messages; empty when it can be inserted.
+    """
+    venue_id, artist_id = show["venue_id"], show["artist_id"]
+    start_time, end_time = show["start_time"], show["end_time"]
+    venue, artist, venue_clash, artist_clash = db.session.execute(
+        select(
+            select(Venue.id).where(Venue.id == venue_id).scalar_subquery(),
+            select(Artist.id).where(Artist.id == artist_id).scalar_subquery(),
+            _clash(shows_list.c.venue_id, venue_id, start_time, end_time),
+            _clash(shows_list.c.artist_id, artist_id, start_time, end_time),
+        )
+    ).one()
+    problems = []
+    if venue is None:
+        problems.append(f"There is no venue with id {venue_id}.")
+    if artist is None:
+        problems.append(f"There is no artist with id {artist_id}.")
+    if venue_clash is not None:
+        problems.append(_taken("venue", venue_clash))
+    if artist_clash is not None:
+        problems.append(_taken("artist", artist_clash))
+    return problems
+
+
+def _overlaps(show, other):
+    return (
+        other["start_time"] < show["end_time"]
+        and other["end_time"] > show["start_time"]
+    )
+
+
+def check_start_time(start_time):
+    """Problems with ``start_time`` as a show's start, as messages.
+
+    Shows are stored in their venue's local time, without a time zone, so a
+    time with an offset cannot be placed.
+    """
+    if start_time.tzinfo is not None:
+        return [
+            f"{start_time.isoformat()} has a time zone; "
+            "give the venue's local time instead."
+        ]
+    return []
+
+
+def _parse_date(date):
+    import dateutil.parser
+
+    venue_id, start_time = date
+    try:
+        venue_id = int(venue_id)
+    except (TypeError, ValueError):
+        return None, f"{venue_id!r} is not a venue id."
+    if not isinstance(start_time, datetime):
+        try:
+            start_time = dateutil.parser.parse(start_time)
+        except (TypeError, ValueError, OverflowError):
+            return None, f"{start_time!r} is not a date and time."
+    problems = check_start_time(start_time)
+    if problems:
+        return None, problems[0]
+    return {"venue_id": venue_id, "start_time": start_time}, None
+
+
+def _known(artist_id, venue_ids):
+    venues = select(literal("venue"), Venue.id).where(Venue.id.in_(venue_ids))
+    artist = select(literal("artist"), Artist.id).where(Artist.id == artist_id)
+    return set(db.session.execute(union_all(venues, artist)).tuples())
+
+
+def _clashes(shows):
+    """Existing shows overlapping any of ``shows``, as dicts."""
+    duration = show_duration()
+    found = []
+    for start in range(0, len(shows), CLASH_CHUNK_SIZE):
+        windows = []
+        for show in shows[start : start + CLASH_CHUNK_SIZE]:
+            for owner in OWNERS:
+                windows.append(
+                    and_(
+                        shows_list.c[f"{owner}_id"] == show[f"{owner}_id"],
+                        shows_list.c.start_time < show["end_time"],
+                        shows_list.c.start_time > show["start_time"] - duration,
+                        shows_list.c.end_time > show["start_time"],
+                    )
+                )
+        query = select(
+            shows_list.c.venue_id,
+            shows_list.c.artist_id,
+            shows_list.c.start_time,
+            shows_list.c.end_time,
+        ).where(or_(*windows))
+        found += db.session.execute(query).mappings().all()
+    return found
+
+
+def check_batch(shows):
+    """Problems that would stop each of ``shows`` (``shows`` rows as dicts)
+    from being booked together, as one list of messages per show, in order.
+
+    A show clashes with existing shows of its venue or artist, looked up with
+    one query per ``CLASH_CHUNK_SIZE`` shows, and with earlier shows of the
+    batch itself, of which the earliest is kept.
+    """
+    problems = [[] for _ in shows]
+    clashes = _clashes(shows)
+    for show, found in zip(shows, problems):
+        for clash in clashes:
+            if not _overlaps(show, clash):
+                continue
+            for owner in OWNERS:
+                if clash[f"{owner}_id"] == show[f"{owner}_id"]:
+                    found.append(_taken(owner, clash["start_time"]))
+
+    # Every show lasts SHOW_DURATION, so taken in order of start time, one
+    # that overlaps any kept show of its venue or artist overlaps the last one.
+    kept = {}
+    for index in sorted(range(len(shows)), key=lambda i: shows[i]["start_time"]):
+        show = shows[index]
+        if problems[index]:
+            continue
+        for owner in OWNERS:
+            other = kept.get((owner, show[f"{owner}_id"]))
+            if other is not None and _overlaps(show, other):
+                problems[index].append(
+                    f"The {owner} has another show at "
+                    f"{other['start_time']:%Y-%m-%d %H:%M} in this batch."
+                )
+        if not problems[index]:
+            for owner in OWNERS:
+                kept[(owner, show[f"{owner}_id"])] = show
+    return problems
+
+
+def book_tour(artist_id, dates, partial=False):
+    """Book a show of ``artist_id`` for each ``(venue_id, start_time)`` of
+    ``dates``, without committing.
+
+    All of them are booked or, if any has a problem, none; with ``partial``
+    the ones without problems are booked regardless. Returns one report per
+    date, in order: a dict with ``venue_id``, ``start_time``, the new show's
+    ``id`` (``None`` when it was not booked) and a list of ``problems``.
+    """
+    reports = []
+    shows = []
+    for date in dates:
+        show, problem = _parse_date(date)
+        venue_id, start_time = (show["venue_id"], show["start_time"]) if show else date
+        report = {
+            "venue_id": venue_id,
+            "start_time": start_time,
+            "id": None,
+            "problems": [problem] if problem else [],
+        }
+        reports.append(report)
+        if show:
+            show.update(artist_id=artist_id, end_time=start_time + show_duration())
+            shows.append((report, show))
+    if not shows:
+        return reports
+
+    known = _known(artist_id, {show["venue_id"] for _, show in shows})
+    for report, show in shows:
+        if ("artist", artist_id) not in known:
+            report["problems"].append(f"There is no artist with id {artist_id}.")
+        if ("venue", show["venue_id"]) not in known:
+            report["problems"].append(f"There is no venue with id {show['venue_id']}.")
+    candidates = [(report, show) for report, show in shows if not report["problems"]]
+    problems = check_batch([show for _, show in candidates])
+    accepted = []
+    for (report, show), found in zip(candidates, problems):
+        report["problems"] += found
+        if not found:
+            accepted.append((report, show))
+
+    if not accepted or not partial and any(report["problems"] for report in reports):
+        return reports
+    now = datetime.now()
+    rows = [{**show, "created_at": now, "updated_at": now} for _, show in accepted]
+    ids = db.session.execute(
+        shows_list.insert().returning(shows_list.c.id, sort_by_parameter_order=True),
+        rows,
+    ).scalars()
+    for (report, _), show_id in zip(accepted, ids):
+        report["id"] = show_id
+    return reports
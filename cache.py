@@ -0,0 +1,159 @@
+"""Versioned page cache for venue and artist detail pages.
+
+Entries are keyed by entity kind, id and the page's version: its validator
+from conditional.py, read from the database by the ``conditional`` decorator
+before the view runs. Every write that changes a page moves the validator
+forward, in whichever process or command it happens, so the next read in any
+worker misses; stale entries are never served and simply age out of the
+backend. A per-process backend is therefore safe with any number of workers,
+it just fills once per worker. Entries may also carry a lifetime, used to
+drop a page at the moment its next upcoming show turns into a past one.
+
+Backends only need ``get``/``set``/``delete`` with an optional ``ttl`` in
+seconds, which maps directly onto a Redis-like store.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, session
+
+
+class CacheBackend:
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class NullBackend(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU; each worker process has its own copy."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class FileBackend(CacheBackend):
+    """Pickled entries in a local directory, shared by workers on one host."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                value, expires_at = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        # Write to a temporary file first so readers never see a partial entry.
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((value, expires_at), f)
+        os.replace(tmp, self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class PageCache:
+    def __init__(self, backend=None):
+        self.backend = backend or NullBackend()
+
+    def init_app(self, app):
+        app.extensions["page_cache"] = self
+        kind = app.config.get("CACHE_BACKEND", "memory")
+        if kind == "memory":
+            self.backend = MemoryBackend(app.config.get("CACHE_MAX_ENTRIES", 1024))
+        elif kind == "file":
+            self.backend = FileBackend(app.config["CACHE_DIR"])
+        elif kind == "null":
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {kind!r}")
+
+    def key(self, kind, entity_id):
+        """Cache key for the version of an entity's page this request validated,
+        or ``None`` when it read no validator.
+
+        The validator is read before the page's data: if a write lands in
+        between, the page built from the new data is stored under the old key
+        and never served.
+        """
+        version = g.get("page_version")
+        if version is None:
+            return None
+        return f"{kind}:{entity_id}:{version}"
+
+    def get(self, key):
+        # Pages are rendered with the layout's flash messages, so a request
+        # that has some pending neither reads nor fills the cache.
+        if key is None or "_flashes" in session:
+            return None
+        return self.backend.get(key)
+
+    def set(self, key, page, ttl=None):
+        if key is None or "_flashes" in session:
+            return
+        if ttl is not None and ttl <= 0:
+            return
+        self.backend.set(key, page, ttl)
@@ -0,0 +1,150 @@
+"""``flask fyyur ...`` maintenance commands.
+
+The loaders are imported inside the commands so that creating the app (in
+every web worker) does not pay for them.
+"""
+
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache
+
+import summary
+from models import db
+
+fyyur_cli = AppGroup("fyyur", help="Fyyur data maintenance commands.")
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+@fyyur_cli.command("import")
+@click.argument("kind", type=click.Choice(["venues", "artists", "shows"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "format_",
+    type=click.Choice(["csv", "jsonl"]),
+    help="File format; guessed from the extension by default.",
+)
+@click.option("--batch-size", default=5000, show_default=True)
+@click.option(
+    "--max-errors", default=50, show_default=True, help="Row errors to print."
+)
+def import_command(kind, path, format_, batch_size, max_errors):
+    """Bulk load KIND rows from a CSV or JSONL file at PATH.
+
+    Show rows reference their venue and artist either by venue_id/artist_id
+    or by unique name in venue/artist columns.
+    """
+    import importer
+
+    format_ = format_ or FORMATS.get(os.path.splitext(path)[1].lower())
+    if format_ is None:
+        raise click.UsageError("Cannot guess the file format, pass --format.")
+
+    def progress(report):
+        click.echo(f"{kind}: {report.loaded} loaded, {report.rejected} rejected")
+
+    with open(path, newline="", encoding="utf-8") as stream:
+        report = importer.load(
+            kind, importer.read_rows(stream, format_), batch_size, progress
+        )
+
+    for line, message in report.errors[:max_errors]:
+        where = f"line {line}" if line is not None else "batch"
+        click.echo(f"{where}: {message}", err=True)
+    if len(report.errors) > max_errors:
+        click.echo(f"... {len(report.errors) - max_errors} more errors", err=True)
+    click.echo(f"Done: {report.loaded} {kind} loaded, {report.rejected} rejected.")
+
+
+@fyyur_cli.command("export")
+@click.argument("kind", type=click.Choice(["venues", "artists", "shows"]))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Output file; standard output by default.",
+)
+@click.option(
+    "--format",
+    "format_",
+    type=click.Choice(["csv", "jsonl"]),
+    help="File format; guessed from the output extension, csv by default.",
+)
+@click.option(
+    "--since",
+    help="Only rows created or edited at or after this ISO datetime.",
+)
+@click.option("--gzip", "compress", is_flag=True, help="Gzip the output.")
+@click.option("--batch-size", default=1000, show_default=True)
+def export_command(kind, output, format_, since, compress, batch_size):
+    """Stream every KIND row out as CSV or JSONL."""
+    import exporter
+
+    if format_ is None and output:
+        name = output[:-3] if output.endswith(".gz") else output
+        format_ = FORMATS.get(os.path.splitext(name)[1].lower())
+    format_ = format_ or "csv"
+    if since is not None:
+        try:
+            since = exporter.parse_since(since)
+        except ValueError:
+            raise click.BadParameter("not an ISO datetime", param_hint="--since")
+
+    chunks = exporter.export(kind, format_, since, compress, batch_size)
+    with click.open_file(output or "-", "wb") as stream:
+        for chunk in chunks:
+            stream.write(chunk)
+
+
+@fyyur_cli.command("roll-shows")
+@click.option(
+    "--rebuild", is_flag=True, help="Recount every venue and artist from scratch."
+)
+def roll_shows_command(rebuild):
+    """Move shows that have started from upcoming to past in the summaries."""
+    if rebuild:
+        summary.rebuild()
+        db.session.commit()
+        click.echo("Show summaries rebuilt.")
+        return
+    rolled = summary.roll()
+    db.session.commit()
+    click.echo(f"{rolled} summaries recounted.")
+
+
+@fyyur_cli.command("warm")
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Bytecode cache to fill; defaults to TEMPLATE_CACHE_DIR.",
+)
+def warm_command(cache_dir):
+    """Precompile every template into the template bytecode cache."""
+    import templating
+
+    env = current_app.jinja_env
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    elif env.bytecode_cache is None:
+        raise click.UsageError("Set TEMPLATE_CACHE_DIR or pass --cache-dir.")
+    names = templating.warm(env)
+    click.echo(f"{len(names)} templates compiled.")
+
+
+@fyyur_cli.command("assets")
+@click.option("--clean", is_flag=True, help="Remove earlier builds first.")
+def assets_command(clean):
+    """Bundle, fingerprint and precompress the static files into static/dist."""
+    import assets
+
+    manifest = assets.build(
+        current_app.static_folder, current_app.static_url_path, clean
+    )
+    for name in assets.BUNDLES:
+        click.echo(f"{name} -> {manifest['assets'][name]}")
+    click.echo(f"{len(manifest['assets'])} assets built.")
@@ -0,0 +1,122 @@
+"""Conditional GET for the venue and artist pages.
+
+A detail page changes when its entity is edited, when one of its shows is
+added, changed or removed, and when one of its shows starts and moves from
+upcoming to past. Its ``Last-Modified`` is therefore the latest of the
+entity's ``updated_at``, its shows' ``updated_at`` and the start of its most
+recent past show, read in one query on the ``shows`` indexes that lead with
+the owner id. The ``ETag`` is derived from the same time and ``RELEASE``, so
+a deploy revalidates pages rendered by the previous templates.
+
+Edits that change another entity's page (a venue's name shows on the pages
+of its artists) ``touch`` that entity, and deleting shows touches their other
+side, so its validators move forward too. A matching ``If-None-Match`` or
+``If-Modified-Since`` gets a 304 before the page is looked up or rendered.
+The ETag is also the version the page cache (cache.py) keys the page by.
+"""
+
+import inspect
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+from sqlalchemy import func, select, update
+from werkzeug.exceptions import NotFound
+
+from models import db, Venue, Artist, shows_list
+
+ENTITIES = {
+    "venue": (Venue, shows_list.c.venue_id),
+    "artist": (Artist, shows_list.c.artist_id),
+}
+
+
+def touch(kind, ids, now=None):
+    """Move the ``updated_at`` of the ``ids`` entities of ``kind`` forward."""
+    ids = list(ids)
+    if not ids:
+        return
+    model, _ = ENTITIES[kind]
+    now = now or datetime.now()
+    db.session.execute(update(model).where(model.id.in_(ids)).values(updated_at=now))
+
+
+def validator_query(kind, entity_id, now):
+    model, key = ENTITIES[kind]
+    shows = select(func.max(shows_list.c.updated_at)).where(key == entity_id)
+    started = select(func.max(shows_list.c.start_time)).where(
+        key == entity_id, shows_list.c.start_time <= now
+    )
+    return select(
+        model.updated_at, shows.scalar_subquery(), started.scalar_subquery()
+    ).where(model.id == entity_id)
+
+
+def _validators(kind, entity_id, row):
+    if row is None:
+        raise NotFound()
+    modified = max(value for value in row if value is not None)
+    etag = f"{kind}-{entity_id}-{modified.timestamp():.6f}"
+    release = current_app.config.get("RELEASE")
+    if release:
+        etag = f"{etag}-{release}"
+    # Also the version the page cache stores the rendered page under.
+    g.page_version = etag
+    return etag, modified.astimezone(timezone.utc)
+
+
+def _not_modified(etag, modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None:
+        return modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _respond(rv, etag, modified):
+    response = make_response(rv)
+    response.set_etag(etag)
+    response.last_modified = modified
+    # Cached copies must be revalidated, which is what makes them cheap.
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional(kind):
+    """Decorate the detail view of ``kind``, which takes ``<kind>_id``."""
+
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(**kwargs):
+                # Pages with pending flash messages are one-offs.
+                if "_flashes" in session:
+                    return await view(**kwargs)
+                import aio
+
+                entity_id = kwargs[f"{kind}_id"]
+                rows = await aio.fetch(validator_query(kind, entity_id, datetime.now()))
+                etag, modified = _validators(kind, entity_id, rows[0] if rows else None)
+                if _not_modified(etag, modified):
+                    return _respond(("", 304), etag, modified)
+                return _respond(await view(**kwargs), etag, modified)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(**kwargs):
+            if "_flashes" in session:
+                return view(**kwargs)
+            entity_id = kwargs[f"{kind}_id"]
+            row = db.session.execute(
+                validator_query(kind, entity_id, datetime.now())
+            ).first()
+            etag, modified = _validators(kind, entity_id, row)
+            if _not_modified(etag, modified):
+                return _respond(("", 304), etag, modified)
+            return _respond(view(**kwargs), etag, modified)
+
+        return wrapper
+
+    return decorator
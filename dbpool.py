@@ -0,0 +1,115 @@
+"""Connection pool settings and health, reported at ``/healthz/db``.
+
+The pool itself is configured by ``config.engine_options`` from the
+environment. ``DB_STATEMENT_TIMEOUT`` is set with ``SET LOCAL
+statement_timeout`` at the start of each Postgres transaction, on the primary,
+the replicas and aio.py's engine alike. A session-level ``SET``, or a startup
+option, would not survive PgBouncer in transaction mode (``DB_POOL=null``),
+which hands the server connection to other clients between transactions; the
+price is one more round trip per transaction.
+
+``/healthz/db`` checks a connection out of each engine's pool, runs
+``SELECT 1`` and reports how long both took, with the pool's checked-out,
+idle and overflow counts taken just before. The counts and the mean checkout
+wait of requests (from metrics.py) are those of the worker that answers.
+It responds with 503 when the primary cannot be reached.
+"""
+
+import time
+
+from flask import current_app, jsonify
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+
+from models import db
+
+
+def _statement_timeout(timeout):
+    statement = f"SET LOCAL statement_timeout = {int(timeout)}"
+
+    def set_timeout(connection):
+        connection.exec_driver_sql(statement)
+
+    return set_timeout
+
+
+def apply_statement_timeout(engine, timeout):
+    """Limit each statement of ``engine``'s transactions to ``timeout`` ms, on
+    Postgres.
+    """
+    if timeout and engine.dialect.name == "postgresql":
+        event.listen(engine, "begin", _statement_timeout(timeout))
+
+
+def _engines(app):
+    with app.app_context():
+        engines = [db.engine]
+    replicas = app.extensions.get("replicas")
+    if replicas is not None:
+        engines += [replica.engine for replica in replicas.replicas]
+    return engines
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # Starts at -size and counts every connection opened.
+            overflow=max(pool.overflow(), 0),
+        )
+    return status
+
+
+def probe(engine):
+    """Pool status of ``engine`` and the time to check out and use a connection."""
+    status = pool_status(engine)
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            checked_out = time.perf_counter()
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        status.update(ok=False, error=str(e))
+        return status
+    finished = time.perf_counter()
+    status.update(
+        ok=True,
+        checkout_ms=round((checked_out - started) * 1000, 3),
+        query_ms=round((finished - checked_out) * 1000, 3),
+    )
+    return status
+
+
+def health():
+    primary = probe(db.engine)
+    replicas = []
+    extension = current_app.extensions.get("replicas")
+    for replica in extension.replicas if extension else ():
+        status = probe(replica.engine)
+        status.update(url=str(replica.engine.url), lag=replica.lag)
+        replicas.append(status)
+    wait = current_app.extensions["metrics"].checkout_wait
+    return jsonify(
+        {
+            "ok": primary["ok"],
+            "primary": primary,
+            "replicas": replicas,
+            "checkout_wait": {
+                "count": wait.count,
+                "mean_ms": (
+                    round(wait.total / wait.count * 1000, 3) if wait.count else None
+                ),
+            },
+        }
+    ), (200 if primary["ok"] else 503)
+
+
+def init_app(app):
+    timeout = app.config.get("DB_STATEMENT_TIMEOUT")
+    for engine in _engines(app):
+        apply_statement_timeout(engine, timeout)
+    app.add_url_rule("/healthz/db", "db_health", health)
@@ -0,0 +1,176 @@
+"""Streaming export of venues, artists and shows to CSV or JSONL.
+
+Rows are read through a server-side cursor in batches and encoded into
+fixed-size chunks, optionally gzip-compressed on the fly, so memory use does
+not depend on table size. Columns use the names ``flask fyyur import``
+reads, so an export can be loaded back as-is.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import db, Venue, Artist, Genre, shows_list, venue_genres, artist_genres
+from querycheck import batched
+
+CHUNK_SIZE = 64 * 1024
+
+COLUMNS = {
+    "venues": [
+        ("id", Venue.id),
+        ("name", Venue.name),
+        ("city", Venue.city),
+        ("state", Venue.state),
+        ("address", Venue.address),
+        ("phone", Venue.phone),
+        ("image_link", Venue.image_link),
+        ("facebook_link", Venue.facebook_link),
+        ("website_link", Venue.website_link),
+        ("seeking_talent", Venue.is_looking_for_talent),
+        ("seeking_description", Venue.seeking_description),
+    ],
+    "artists": [
+        ("id", Artist.id),
+        ("name", Artist.name),
+        ("city", Artist.city),
+        ("state", Artist.state),
+        ("phone", Artist.phone),
+        ("image_link", Artist.image_link),
+        ("facebook_link", Artist.facebook_link),
+        ("website_link", Artist.website_link),
+        ("seeking_venue", Artist.is_looking_for_venues),
+        ("seeking_description", Artist.seeking_description),
+    ],
+    "shows": [
+        ("venue_id", shows_list.c.venue_id),
+        ("artist_id", shows_list.c.artist_id),
+        ("start_time", shows_list.c.start_time),
+    ],
+}
+
+# Genre names are exported as one ", "-joined column after the table columns.
+GENRE_LINKS = {
+    "venues": venue_genres.c.venue_id,
+    "artists": artist_genres.c.artist_id,
+}
+
+MIMETYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def parse_since(value):
+    """Turn a ``--since`` value, an ISO datetime, into the filter value.
+
+    Rows of every kind are filtered on ``updated_at``, so rows created or
+    edited at or after it are exported. Raises ``ValueError``.
+    """
+    return datetime.fromisoformat(value)
+
+
+def column_names(kind):
+    names = [name for name, _ in COLUMNS[kind]]
+    if kind in GENRE_LINKS:
+        names.append("genres")
+    return names
+
+
+def _genre_names(owner_column, ids):
+    genres = {}
+    rows = (
+        select(owner_column, Genre.name)
+        .join(Genre, Genre.id == owner_column.table.c.genre_id)
+        .where(owner_column.in_(ids))
+        .order_by(owner_column, Genre.name)
+    )
+    for owner_id, name in db.session.execute(rows):
+        genres.setdefault(owner_id, []).append(name)
+    return genres
+
+
+def query_rows(kind, since=None, batch_size=1000):
+    """Yield export rows of ``kind`` as tuples, ``batch_size`` per round trip.
+
+    Genres are fetched with one extra query per batch.
+    """
+    columns = [column for _, column in COLUMNS[kind]]
+    statement = select(*columns)
+    if kind == "shows":
+        if since is not None:
+            statement = statement.where(shows_list.c.updated_at >= since)
+        # Read in the order of the (start_time, id) index.
+        statement = statement.order_by(shows_list.c.start_time, shows_list.c.id)
+    else:
+        model = Venue if kind == "venues" else Artist
+        if since is not None:
+            statement = statement.where(model.updated_at >= since)
+        statement = statement.order_by(model.id)
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    if kind not in GENRE_LINKS:
+        for row in result:
+            yield tuple(row)
+        return
+    for batch in result.partitions():
+        with batched():
+            genres = _genre_names(GENRE_LINKS[kind], [row.id for row in batch])
+        for row in batch:
+            yield (*row, ", ".join(genres.get(row.id, [])))
+
+
+def _text(value):
+    if isinstance(value, datetime):
+        # The format ShowForm.start_time parses.
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, bool):
+        # BooleanField reads "false" (and "") as False.
+        return "true" if value else "false"
+    return value
+
+
+def _encode_csv(kind, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column_names(kind))
+    for row in rows:
+        writer.writerow("" if value is None else _text(value) for value in row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _encode_jsonl(kind, rows):
+    names = column_names(kind)
+    lines, size = [], 0
+    for row in rows:
+        record = {
+            name: value if isinstance(value, bool) else _text(value)
+            for name, value in zip(names, row)
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines)
+            lines, size = [], 0
+    yield "".join(lines)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(kind, format="csv", since=None, compress=False, batch_size=1000):
+    """Yield the encoded export of ``kind`` as byte chunks."""
+    rows = query_rows(kind, since, batch_size)
+    encode = _encode_csv if format == "csv" else _encode_jsonl
+    chunks = (text.encode("utf-8") for text in encode(kind, rows) if text)
+    return _gzip(chunks) if compress else chunks
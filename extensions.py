@@ -0,0 +1,20 @@
+"""Extension instances, bound to an app in ``app.create_app``."""
+
+from flask_migrate import Migrate
+from flask_moment import Moment
+
+from assets import Assets
+from autocomplete import Autocomplete
+from cache import PageCache
+from metrics import Metrics
+from querycheck import QueryCheck
+from replicas import Replicas
+
+assets = Assets()
+autocomplete = Autocomplete()
+moment = Moment()
+migrate = Migrate()
+page_cache = PageCache()
+metrics = Metrics()
+query_check = QueryCheck()
+replicas = Replicas()
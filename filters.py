@@ -0,0 +1,37 @@
+"""Jinja filters."""
+
+from datetime import datetime
+from functools import lru_cache
+
+DATETIME_FORMATS = {
+    "full": "EEEE MMMM, d, y 'at' h:mma",
+    "medium": "EE MM, dd, y h:mma",
+}
+
+
+@lru_cache(maxsize=None)
+def datetime_pattern(format):
+    # babel is only loaded once a page with a date is rendered.
+    import babel.dates
+
+    return babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format))
+
+
+@lru_cache(maxsize=None)
+def datetime_locale():
+    import babel
+
+    return babel.Locale.parse("en")
+
+
+def format_datetime(value, format="medium"):
+    # Views pass datetime objects; strings are still accepted, with ISO-8601
+    # parsed natively and anything else left to dateutil.
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            import dateutil.parser
+
+            value = dateutil.parser.parse(value)
+    return datetime_pattern(format).apply(value, datetime_locale())
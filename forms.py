@@ -7,6 +7,7 @@ from wtforms import (
     SelectMultipleField,
     DateTimeField,
     BooleanField,
+    TextAreaField,
 )
 from wtforms.validators import DataRequired, AnyOf, URL, ValidationError
 
@@ -125,6 +126,19 @@ class ShowForm(FlaskForm):
     )
 
 
+class TourForm(FlaskForm):
+    artist_id = StringField("artist_id", validators=[DataRequired()])
+    # One "venue_id, start_time" pair per line.
+    dates = TextAreaField("dates", validators=[DataRequired()])
+    mode = SelectField(
+        "mode",
+        choices=[
+            ("all", "Book every date or none"),
+            ("partial", "Book the dates that are free"),
+        ],
+    )
+
+
 class VenueForm(FlaskForm):
     name = StringField("name", validators=[DataRequired()])
     city = StringField("city", validators=[DataRequired()])
@@ -0,0 +1,300 @@
+"""Bulk loading of venues, artists and shows from CSV or JSONL files.
+
+Rows are streamed from the file, validated with the same WTForms classes the
+create pages use, and written in batches: shows with ``COPY ... FROM STDIN``
+on Postgres and one ``executemany`` insert elsewhere, venues and artists with
+a multi-row ``INSERT ... RETURNING`` so their genres can be linked. Each batch
+is its own transaction, together with its show summary updates, so a bad
+batch is reported and skipped without losing the batches before it.
+
+Shows get ``end_time`` from ``SHOW_DURATION``. Before a batch of shows is
+written, ``booking.check_batch`` checks it against the shows already booked
+and against itself; overlapping rows are rejected one by one and the rest of
+the batch goes in. Postgres' exclusion constraints stay as the backstop for
+shows booked concurrently, and fail the whole batch.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import select
+from werkzeug.datastructures import MultiDict
+
+from forms import ArtistForm, ShowForm, VenueForm
+from models import db, Venue, Artist, Genre, shows_list, venue_genres, artist_genres
+import booking
+import summary
+
+FORMS = {"venues": VenueForm, "artists": ArtistForm, "shows": ShowForm}
+
+
+class ImportReport:
+    def __init__(self):
+        self.loaded = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, line, message, rows=1):
+        self.rejected += rows
+        self.errors.append((line, message))
+
+
+def read_rows(stream, format):
+    """Yield ``(line, row)`` pairs from an open text file.
+
+    ``row`` is a dict, or None for a JSONL line that is not valid JSON.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == "jsonl":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            yield line, row
+    else:
+        raise ValueError(f"Unknown import format {format!r}")
+
+
+def _formdata(row):
+    data = MultiDict()
+    for field, value in row.items():
+        if value is None:
+            continue
+        if field == "genres":
+            # JSONL carries a list, CSV the same ", "-joined text we store.
+            if isinstance(value, str):
+                value = [genre.strip() for genre in value.split(",") if genre.strip()]
+            for genre in value:
+                data.add(field, genre)
+        elif isinstance(value, bool):
+            if value:
+                data.add(field, "y")
+        else:
+            data.add(field, str(value))
+    return data
+
+
+def _errors(form):
+    return "; ".join(
+        f"{field}: {', '.join(messages)}" for field, messages in form.errors.items()
+    )
+
+
+def _venue_values(form):
+    return {
+        "name": form.name.data,
+        "city": form.city.data,
+        "state": form.state.data,
+        "address": form.address.data,
+        "phone": form.phone.data,
+        "genres": form.genres.data,
+        "image_link": form.image_link.data,
+        "facebook_link": form.facebook_link.data,
+        "website_link": form.website_link.data,
+        "is_looking_for_talent": form.seeking_talent.data,
+        "seeking_description": form.seeking_description.data,
+    }
+
+
+def _artist_values(form):
+    return {
+        "name": form.name.data,
+        "city": form.city.data,
+        "state": form.state.data,
+        "phone": form.phone.data,
+        "genres": form.genres.data,
+        "image_link": form.image_link.data,
+        "facebook_link": form.facebook_link.data,
+        "website_link": form.website_link.data,
+        "is_looking_for_venues": form.seeking_venue.data,
+        "seeking_description": form.seeking_description.data,
+    }
+
+
+class _ShowKeys:
+    """Resolves show rows' venue/artist references, by id or by unique name."""
+
+    def __init__(self):
+        self.venues = self._load(Venue)
+        self.artists = self._load(Artist)
+
+    @staticmethod
+    def _load(model):
+        ids, names = set(), {}
+        for entity_id, name in db.session.query(model.id, model.name):
+            ids.add(entity_id)
+            # A name shared by several rows cannot be used as a key.
+            names[name] = None if name in names else entity_id
+        return ids, names
+
+    def resolve(self, kind, row):
+        ids, names = self.venues if kind == "venue" else self.artists
+        value = row.get(f"{kind}_id")
+        if value not in (None, ""):
+            try:
+                entity_id = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{kind}_id: not a number") from None
+            if entity_id not in ids:
+                raise ValueError(f"{kind}_id: no {kind} with id {entity_id}")
+            return entity_id
+        name = row.get(kind) or row.get(f"{kind}_name")
+        if not name:
+            raise ValueError(f"{kind}_id: missing")
+        if name not in names:
+            raise ValueError(f"{kind}: no {kind} named {name!r}")
+        if names[name] is None:
+            raise ValueError(f"{kind}: {name!r} is ambiguous, use {kind}_id")
+        return names[name]
+
+
+def _validate(kind, rows, report, show_keys=None):
+    """Yield ``(line, values)`` for each valid row of ``rows``."""
+    for line, row in rows:
+        if not isinstance(row, dict):
+            report.reject(line, "not a JSON object")
+            continue
+        if kind == "shows":
+            try:
+                venue_id = show_keys.resolve("venue", row)
+                artist_id = show_keys.resolve("artist", row)
+            except ValueError as e:
+                report.reject(line, str(e))
+                continue
+            # ShowForm defaults start_time to when it was imported.
+            if not str(row.get("start_time") or "").strip():
+                report.reject(line, "start_time: missing")
+                continue
+        form = FORMS[kind](formdata=_formdata(row), meta={"csrf": False})
+        if not form.validate():
+            report.reject(line, _errors(form))
+            continue
+        if kind == "venues":
+            yield line, _venue_values(form)
+        elif kind == "artists":
+            yield line, _artist_values(form)
+        else:
+            yield line, {
+                "venue_id": venue_id,
+                "artist_id": artist_id,
+                "start_time": form.start_time.data,
+                "end_time": form.start_time.data + booking.show_duration(),
+            }
+
+
+def _copy(connection, table, values):
+    columns = list(values[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in values:
+        # COPY's CSV format reads an unquoted empty field as NULL.
+        writer.writerow(["" if row[c] is None else row[c] for c in columns])
+    buffer.seek(0)
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def _genre_ids(connection, names, known):
+    """Map genre names to ids, inserting the ones not in the database yet."""
+    missing = set(names) - known.keys()
+    if missing:
+        table = Genre.__table__
+        rows = connection.execute(
+            select(table.c.name, table.c.id).where(table.c.name.in_(missing))
+        )
+        known.update((name, genre_id) for name, genre_id in rows)
+        new = [{"name": name} for name in missing - known.keys()]
+        if new:
+            rows = connection.execute(
+                table.insert().returning(table.c.name, table.c.id), new
+            )
+            known.update((name, genre_id) for name, genre_id in rows)
+    return known
+
+
+def _write_shows(values):
+    connection = db.session.connection()
+    if connection.dialect.name == "postgresql":
+        # COPY does not apply the column defaults.
+        now = datetime.now()
+        values = [{**row, "created_at": now, "updated_at": now} for row in values]
+        _copy(connection, shows_list, values)
+    else:
+        connection.execute(shows_list.insert(), values)
+
+
+def _write_entities(model, owner_column, values, known_genres):
+    # Ids are needed to link genres, so venues and artists go through one
+    # multi-row INSERT ... RETURNING per batch rather than COPY.
+    connection = db.session.connection()
+    table = model.__table__
+    genres = [row.pop("genres") for row in values]
+    ids = connection.execute(
+        table.insert().returning(table.c.id, sort_by_parameter_order=True), values
+    ).scalars()
+    genre_ids = _genre_ids(
+        connection, {name for names in genres for name in names}, known_genres
+    )
+    links = [
+        {owner_column.name: entity_id, "genre_id": genre_ids[name]}
+        for entity_id, names in zip(ids, genres)
+        for name in names
+    ]
+    if links:
+        connection.execute(owner_column.table.insert(), links)
+
+
+def load(kind, rows, batch_size=5000, progress=None):
+    """Validate and insert ``rows`` (``(line, dict)`` pairs) of ``kind``.
+
+    ``kind`` is ``"venues"``, ``"artists"`` or ``"shows"``. ``progress`` is
+    called with the report after every batch.
+    """
+    report = ImportReport()
+    show_keys = _ShowKeys() if kind == "shows" else None
+    known_genres = {}
+    values = _validate(kind, rows, report, show_keys)
+    while True:
+        batch = list(islice(values, batch_size))
+        if not batch:
+            break
+        lines = [line for line, _ in batch]
+        batch = [row for _, row in batch]
+        try:
+            if kind == "shows":
+                problems = booking.check_batch(batch)
+                for line, found in zip(lines, problems):
+                    if found:
+                        report.reject(line, " ".join(found))
+                batch = [row for row, found in zip(batch, problems) if not found]
+                if batch:
+                    _write_shows(batch)
+                    summary.add_shows(batch)
+            elif kind == "venues":
+                _write_entities(Venue, venue_genres.c.venue_id, batch, known_genres)
+            else:
+                _write_entities(Artist, artist_genres.c.artist_id, batch, known_genres)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            # Genre ids learnt in the failed transaction may not exist.
+            known_genres.clear()
+            report.reject(None, f"batch of {len(batch)} rows failed: {e}", len(batch))
+        else:
+            report.loaded += len(batch)
+        if progress is not None:
+            progress(report)
+    return report
@@ -0,0 +1,200 @@
+"""Per-request latency and SQL instrumentation, exported at ``/metrics``.
+
+SQLAlchemy cursor events time every statement and Flask request signals fold
+the totals into per-endpoint series when the request ends. Series are kept in
+process memory, so with several workers each one reports its own; scrape them
+individually or sum them in the collector. ``Server-Timing`` headers can be
+enabled with ``METRICS_SERVER_TIMING``.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, current_app, g, has_request_context, request
+from flask import got_request_exception, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.total}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class RequestStats:
+    """What one request spent on the database."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.checkout_started = None
+
+
+class Metrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.requests = defaultdict(int)
+        self.queries = defaultdict(int)
+        self.db_time = defaultdict(float)
+        self.rows = defaultdict(int)
+        self.checkout_wait = Histogram(WAIT_BUCKETS)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["metrics"] = self
+        self.server_timing = app.config.get("METRICS_SERVER_TIMING", False)
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+        got_request_exception.connect(self._request_failed, app)
+        # Listening on the classes covers every engine and pool the app makes.
+        if not event.contains(Engine, "before_cursor_execute", _before_execute):
+            event.listen(Engine, "before_cursor_execute", _before_execute)
+            event.listen(Engine, "after_cursor_execute", _after_execute)
+            event.listen(Session, "do_orm_execute", _before_checkout)
+            event.listen(Pool, "checkout", _checked_out)
+        app.add_url_rule("/metrics", "metrics", self.render)
+
+    def _request_started(self, sender, **extra):
+        g.request_stats = RequestStats()
+
+    def _request_failed(self, sender, exception, **extra):
+        g.request_failed = True
+
+    def _request_finished(self, sender, response, **extra):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return
+        elapsed = time.perf_counter() - stats.started
+        endpoint = request.endpoint or "unmatched"
+        status = 500 if g.get("request_failed") else response.status_code
+        with self._lock:
+            self.latency[endpoint].observe(elapsed)
+            self.requests[(endpoint, status)] += 1
+            self.queries[endpoint] += stats.queries
+            self.db_time[endpoint] += stats.db_time
+            self.rows[endpoint] += stats.rows
+        if self.server_timing:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", '
+                f"total;dur={elapsed * 1000:.2f}",
+            )
+
+    def observe_checkout(self, wait):
+        with self._lock:
+            self.checkout_wait.observe(wait)
+
+    def lines(self):
+        with self._lock:
+            yield "# HELP fyyur_request_duration_seconds Request latency by endpoint."
+            yield "# TYPE fyyur_request_duration_seconds histogram"
+            for endpoint, histogram in sorted(self.latency.items()):
+                yield from histogram.lines(
+                    "fyyur_request_duration_seconds", f'endpoint="{endpoint}"'
+                )
+            yield "# HELP fyyur_requests_total Requests by endpoint and status."
+            yield "# TYPE fyyur_requests_total counter"
+            for (endpoint, status), count in sorted(self.requests.items()):
+                yield (
+                    f'fyyur_requests_total{{endpoint="{endpoint}",status="{status}"}}'
+                    f" {count}"
+                )
+            for name, series, description in (
+                ("fyyur_db_queries_total", self.queries, "SQL statements executed."),
+                ("fyyur_db_seconds_total", self.db_time, "Time spent in SQL."),
+                (
+                    "fyyur_db_rows_total",
+                    self.rows,
+                    "Rows returned or affected, as the driver reports them.",
+                ),
+            ):
+                yield f"# HELP {name} {description}"
+                yield f"# TYPE {name} counter"
+                for endpoint, value in sorted(series.items()):
+                    yield f'{name}{{endpoint="{endpoint}"}} {value}'
+            yield (
+                "# HELP fyyur_db_pool_checkout_wait_seconds "
+                "Time from a request's first statement to getting a connection."
+            )
+            yield "# TYPE fyyur_db_pool_checkout_wait_seconds histogram"
+            yield from self.checkout_wait.lines(
+                "fyyur_db_pool_checkout_wait_seconds", ""
+            )
+
+    def render(self):
+        return Response(
+            "\n".join(self.lines()) + "\n", mimetype="text/plain; version=0.0.4"
+        )
+
+
+def _stats():
+    if has_request_context():
+        return g.get("request_stats")
+    return None
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context, which a statement that fails simply drops.
+    context._query_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = _stats()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_time += elapsed
+    # psycopg2 reports the rows a SELECT returned; drivers that do not know
+    # the count up front (sqlite3, server-side cursors) report -1.
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _before_checkout(orm_execute_state):
+    # The first statement of a session transaction is what checks a
+    # connection out of the pool; remember when it started waiting.
+    stats = _stats()
+    if stats is not None and orm_execute_state.session.in_transaction() is False:
+        stats.checkout_started = time.perf_counter()
+
+
+def _checked_out(dbapi_connection, connection_record, connection_proxy):
+    stats = _stats()
+    if stats is None or stats.checkout_started is None:
+        return
+    wait = time.perf_counter() - stats.checkout_started
+    stats.checkout_started = None
+    current_app.extensions["metrics"].observe_checkout(wait)
@@ -0,0 +1,93 @@
+"""search indexes
+
+Revision ID: 4b1e2f6c9a10
+Revises: ca9141d68e3b
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1e2f6c9a10'
+down_revision = 'ca9141d68e3b'
+branch_labels = None
+depends_on = None
+
+DOCUMENT_COLUMNS = ('name', 'city', 'state', 'genres')
+TABLES = {'Venue': 'venue_search', 'Artist': 'artist_search'}
+
+
+def pg_document():
+    # Kept in sync with search.pg_document() so the planner matches it.
+    parts = " || ' ' || ".join(
+        f"coalesce({column}, '')" for column in DOCUMENT_COLUMNS
+    )
+    return f"to_tsvector('simple'::regconfig, {parts})"
+
+
+def upgrade_postgresql():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        prefix = table.lower()
+        op.execute(
+            f'CREATE INDEX ix_{prefix}_name_trgm ON "{table}" '
+            f'USING gin (name gin_trgm_ops)'
+        )
+        op.execute(
+            f'CREATE INDEX ix_{prefix}_search_document ON "{table}" '
+            f'USING gin (({pg_document()}))'
+        )
+
+
+def upgrade_sqlite():
+    columns = ', '.join(DOCUMENT_COLUMNS)
+    new_columns = ', '.join(f'new.{column}' for column in DOCUMENT_COLUMNS)
+    old_columns = ', '.join(f'old.{column}' for column in DOCUMENT_COLUMNS)
+    for table, fts in TABLES.items():
+        op.execute(
+            f'CREATE VIRTUAL TABLE {fts} USING fts5({columns}, '
+            f"content='{table}', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(f'INSERT INTO {fts}(rowid, {columns}) '
+                   f'SELECT id, {columns} FROM "{table}"')
+        op.execute(
+            f'CREATE TRIGGER {fts}_ai AFTER INSERT ON "{table}" BEGIN '
+            f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_columns}); '
+            f'END'
+        )
+        op.execute(
+            f'CREATE TRIGGER {fts}_ad AFTER DELETE ON "{table}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_columns}); "
+            f'END'
+        )
+        op.execute(
+            f'CREATE TRIGGER {fts}_au AFTER UPDATE ON "{table}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_columns}); "
+            f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_columns}); '
+            f'END'
+        )
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        upgrade_postgresql()
+    elif dialect == 'sqlite':
+        upgrade_sqlite()
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table in TABLES:
+            prefix = table.lower()
+            op.execute(f'DROP INDEX IF EXISTS ix_{prefix}_search_document')
+            op.execute(f'DROP INDEX IF EXISTS ix_{prefix}_name_trgm')
+    elif dialect == 'sqlite':
+        for fts in TABLES.values():
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {fts}')
@@ -0,0 +1,161 @@
+"""normalized genres
+
+Revision ID: 9e6f1b2d4c57
+Revises: 7c3d5a8e2f41
+Create Date: 2026-10-18 13:47:02.604417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e6f1b2d4c57'
+down_revision = '7c3d5a8e2f41'
+branch_labels = None
+depends_on = None
+
+# Owner table -> (association table, owner column, search table)
+OWNERS = {
+    'Venue': ('venue_genres', 'venue_id', 'venue_search'),
+    'Artist': ('artist_genres', 'artist_id', 'artist_search'),
+}
+
+
+def drop_search(dialect):
+    # The search indexes of 4b1e2f6c9a10 cover the genres column.
+    for table, (_, _, fts) in OWNERS.items():
+        if dialect == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{table.lower()}_search_document')
+        elif dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def create_search(dialect, columns):
+    for table, (_, _, fts) in OWNERS.items():
+        if dialect == 'postgresql':
+            parts = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+            op.execute(
+                f'CREATE INDEX ix_{table.lower()}_search_document ON "{table}" '
+                f"USING gin ((to_tsvector('simple'::regconfig, {parts})))"
+            )
+        elif dialect == 'sqlite':
+            names = ', '.join(columns)
+            new = ', '.join(f'new.{c}' for c in columns)
+            old = ', '.join(f'old.{c}' for c in columns)
+            op.execute(
+                f'CREATE VIRTUAL TABLE {fts} USING fts5({names}, '
+                f"content='{table}', content_rowid='id', tokenize='trigram')"
+            )
+            op.execute(f'INSERT INTO {fts}(rowid, {names}) '
+                       f'SELECT id, {names} FROM "{table}"')
+            op.execute(
+                f'CREATE TRIGGER {fts}_ai AFTER INSERT ON "{table}" BEGIN '
+                f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END'
+            )
+            op.execute(
+                f'CREATE TRIGGER {fts}_ad AFTER DELETE ON "{table}" BEGIN '
+                f"INSERT INTO {fts}({fts}, rowid, {names}) "
+                f"VALUES ('delete', old.id, {old}); END"
+            )
+            op.execute(
+                f'CREATE TRIGGER {fts}_au AFTER UPDATE ON "{table}" BEGIN '
+                f"INSERT INTO {fts}({fts}, rowid, {names}) "
+                f"VALUES ('delete', old.id, {old}); "
+                f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END'
+            )
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    genre = op.create_table('Genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    for table, (association, owner, _) in OWNERS.items():
+        op.create_table(association,
+        sa.Column(owner, sa.Integer(), nullable=False),
+        sa.Column('genre_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['genre_id'], ['Genre.id'], ),
+        sa.ForeignKeyConstraint([owner], [f'{table}.id'], ),
+        sa.PrimaryKeyConstraint(owner, 'genre_id')
+        )
+        with op.batch_alter_table(association, schema=None) as batch_op:
+            batch_op.create_index(f'ix_{association}_genre_id_{owner}', ['genre_id', owner], unique=False)
+
+    # Move the ", "-joined genres strings into the new tables.
+    links = {}
+    for table in OWNERS:
+        rows = bind.execute(sa.text(f'SELECT id, genres FROM "{table}"'))
+        links[table] = [
+            (owner_id, name.strip())
+            for owner_id, genres in rows
+            for name in (genres or '').split(',')
+            if name.strip()
+        ]
+    names = sorted({name for pairs in links.values() for _, name in pairs})
+    if names:
+        op.bulk_insert(genre, [{'name': name} for name in names])
+    genre_ids = {
+        name: genre_id
+        for name, genre_id in bind.execute(sa.text('SELECT name, id FROM "Genre"'))
+    }
+    for table, (association, owner, _) in OWNERS.items():
+        rows = {(owner_id, genre_ids[name]) for owner_id, name in links[table]}
+        if rows:
+            op.bulk_insert(
+                sa.table(association, sa.column(owner), sa.column('genre_id')),
+                [{owner: owner_id, 'genre_id': genre_id} for owner_id, genre_id in rows],
+            )
+
+    drop_search(dialect)
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.drop_column('genres')
+        batch_op.create_index(batch_op.f('ix_Venue_state'), ['state'], unique=False)
+    with op.batch_alter_table('Artist', schema=None) as batch_op:
+        batch_op.drop_column('genres')
+    create_search(dialect, ('name', 'city', 'state'))
+
+
+def downgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    drop_search(dialect)
+    for table in OWNERS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('genres', sa.VARCHAR(length=120), nullable=True))
+
+    for table, (association, owner, _) in OWNERS.items():
+        genres = {}
+        rows = bind.execute(sa.text(
+            f'SELECT a.{owner}, g.name FROM {association} a '
+            f'JOIN "Genre" g ON g.id = a.genre_id ORDER BY a.{owner}, g.name'
+        ))
+        for owner_id, name in rows:
+            genres.setdefault(owner_id, []).append(name)
+        for owner_id, names in genres.items():
+            bind.execute(
+                sa.text(f'UPDATE "{table}" SET genres = :genres WHERE id = :id'),
+                {'genres': ', '.join(names), 'id': owner_id},
+            )
+        bind.execute(sa.text(f'UPDATE "{table}" SET genres = \'\' WHERE genres IS NULL'))
+
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Venue_state'))
+        batch_op.alter_column('genres', existing_type=sa.VARCHAR(length=120), nullable=False)
+    with op.batch_alter_table('Artist', schema=None) as batch_op:
+        batch_op.alter_column('genres', existing_type=sa.VARCHAR(length=120), nullable=False)
+
+    for association, owner, _ in OWNERS.values():
+        with op.batch_alter_table(association, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{association}_genre_id_{owner}')
+        op.drop_table(association)
+    op.drop_table('Genre')
+    create_search(dialect, ('name', 'city', 'state', 'genres'))
@@ -0,0 +1,44 @@
+"""created_at and updated_at
+
+Revision ID: c5e9a1f3d2b8
+Revises: b2a8d4f07c13
+Create Date: 2026-10-18 17:05:12.402918
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e9a1f3d2b8'
+down_revision = 'b2a8d4f07c13'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist', 'shows')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    now = sa.bindparam('now', datetime.now(), type_=sa.DateTime())
+    for table in TABLES:
+        op.add_column(table, sa.Column('created_at', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        # Existing rows are dated at the time of the migration.
+        op.execute(sa.text(
+            f'UPDATE "{table}" SET created_at = :now, updated_at = :now'
+        ).bindparams(now))
+        # SQLite can only make a column NOT NULL by rebuilding the table,
+        # which would drop the search triggers on Venue and Artist; the
+        # app always sets both columns.
+        if dialect != 'sqlite':
+            op.alter_column(table, 'created_at', nullable=False)
+            op.alter_column(table, 'updated_at', nullable=False)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'created_at')
@@ -0,0 +1,102 @@
+"""show ids and overlaps
+
+Revision ID: e1d7b3c9a4f6
+Revises: c5e9a1f3d2b8
+Create Date: 2026-10-18 19:12:37.880154
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1d7b3c9a4f6'
+down_revision = 'c5e9a1f3d2b8'
+branch_labels = None
+depends_on = None
+
+# SHOW_DURATION when this was written; existing shows get this length.
+DURATION_SECONDS = 2 * 3600
+
+OWNERS = ('venue_id', 'artist_id')
+
+
+def create_indexes():
+    with op.batch_alter_table('shows', schema=None) as batch_op:
+        batch_op.create_index('ix_shows_artist_id_start_time', ['artist_id', 'start_time'], unique=False)
+        batch_op.create_index('ix_shows_venue_id_start_time', ['venue_id', 'start_time'], unique=False)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    # The primary key changes, so copy the rows into a new table.
+    op.create_table('shows_new',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('end_time > start_time', name='ck_shows_end_after_start'),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    if dialect == 'sqlite':
+        # Keep the text format SQLAlchemy stores, fraction included, so the
+        # values compare as strings the same way they do as times.
+        end_time = (
+            f"strftime('%Y-%m-%d %H:%M:%S', start_time, "
+            f"'+{DURATION_SECONDS} seconds') || substr(start_time, 20)"
+        )
+    else:
+        end_time = f"start_time + interval '{DURATION_SECONDS} seconds'"
+    op.execute(
+        'INSERT INTO shows_new '
+        '(venue_id, artist_id, start_time, end_time, created_at, updated_at) '
+        f'SELECT venue_id, artist_id, start_time, {end_time}, created_at, updated_at '
+        'FROM shows ORDER BY start_time, venue_id, artist_id'
+    )
+    op.drop_table('shows')
+    op.rename_table('shows_new', 'shows')
+    create_indexes()
+
+    if dialect == 'postgresql':
+        op.execute('ALTER SEQUENCE shows_new_id_seq RENAME TO shows_id_seq')
+        op.execute('ALTER INDEX shows_new_pkey RENAME TO shows_pkey')
+        # Fails if existing shows already overlap; those have to be moved
+        # or removed first.
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        for owner in OWNERS:
+            op.execute(
+                f'ALTER TABLE shows ADD CONSTRAINT ex_shows_{owner}_overlap '
+                f'EXCLUDE USING gist ({owner} WITH =, '
+                'tsrange(start_time, end_time) WITH &&)'
+            )
+
+
+def downgrade():
+    # Back to one show per (venue, artist) pair: the earliest one is kept.
+    op.create_table('shows_old',
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+    sa.PrimaryKeyConstraint('venue_id', 'artist_id')
+    )
+    op.execute(
+        'INSERT INTO shows_old '
+        '(venue_id, artist_id, start_time, created_at, updated_at) '
+        'SELECT venue_id, artist_id, min(start_time), min(created_at), '
+        'max(updated_at) FROM shows GROUP BY venue_id, artist_id'
+    )
+    op.drop_table('shows')
+    op.rename_table('shows_old', 'shows')
+    create_indexes()
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER INDEX shows_old_pkey RENAME TO shows_pkey')
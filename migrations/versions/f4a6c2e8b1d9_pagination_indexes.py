@@ -0,0 +1,29 @@
+"""pagination indexes
+
+Revision ID: f4a6c2e8b1d9
+Revises: e1d7b3c9a4f6
+Create Date: 2026-10-19 09:41:27.310552
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a6c2e8b1d9'
+down_revision = 'e1d7b3c9a4f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain CREATE INDEX: a batch operation could rebuild Venue and Artist on
+    # SQLite, dropping their search triggers.
+    op.create_index('ix_shows_start_time_id', 'shows', ['start_time', 'id'], unique=False)
+    op.create_index('ix_Artist_name_id', 'Artist', ['name', 'id'], unique=False)
+    op.create_index('ix_Venue_city_state_name_id', 'Venue', ['city', 'state', 'name', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_Venue_city_state_name_id', table_name='Venue')
+    op.drop_index('ix_Artist_name_id', table_name='Artist')
+    op.drop_index('ix_shows_start_time_id', table_name='shows')
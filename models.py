@@ -1,46 +1,149 @@
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+
+from replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 shows_list = db.Table(
     "shows",
+    db.Column("id", db.Integer, primary_key=True),
+    db.Column("venue_id", db.Integer, db.ForeignKey("Venue.id"), nullable=False),
+    db.Column("artist_id", db.Integer, db.ForeignKey("Artist.id"), nullable=False),
+    db.Column("start_time", db.DateTime, nullable=False),
+    db.Column("end_time", db.DateTime, nullable=False),
+    db.Column("created_at", db.DateTime, nullable=False, default=datetime.now),
+    db.Column(
+        "updated_at",
+        db.DateTime,
+        nullable=False,
+        default=datetime.now,
+        onupdate=datetime.now,
+    ),
+    db.Index("ix_shows_artist_id_start_time", "artist_id", "start_time"),
+    db.Index("ix_shows_venue_id_start_time", "venue_id", "start_time"),
+    # The /shows pagination order, see views/helpers.py.
+    db.Index("ix_shows_start_time_id", "start_time", "id"),
+    db.CheckConstraint("end_time > start_time", name="ck_shows_end_after_start"),
+    # No venue or artist plays two shows at once. Postgres only; booking.py
+    # checks on other databases.
+    ExcludeConstraint(
+        ("venue_id", "="),
+        (db.func.tsrange(db.text("start_time"), db.text("end_time")), "&&"),
+        name="ex_shows_venue_id_overlap",
+        using="gist",
+    ).ddl_if(dialect="postgresql"),
+    ExcludeConstraint(
+        ("artist_id", "="),
+        (db.func.tsrange(db.text("start_time"), db.text("end_time")), "&&"),
+        name="ex_shows_artist_id_overlap",
+        using="gist",
+    ).ddl_if(dialect="postgresql"),
+)
+
+
+venue_genres = db.Table(
+    "venue_genres",
     db.Column("venue_id", db.Integer, db.ForeignKey("Venue.id"), primary_key=True),
+    db.Column("genre_id", db.Integer, db.ForeignKey("Genre.id"), primary_key=True),
+    db.Index("ix_venue_genres_genre_id_venue_id", "genre_id", "venue_id"),
+)
+
+artist_genres = db.Table(
+    "artist_genres",
     db.Column("artist_id", db.Integer, db.ForeignKey("Artist.id"), primary_key=True),
-    db.Column("start_time", db.DateTime, nullable=False),
+    db.Column("genre_id", db.Integer, db.ForeignKey("Genre.id"), primary_key=True),
+    db.Index("ix_artist_genres_genre_id_artist_id", "genre_id", "artist_id"),
 )
 
 
+# Per-venue and per-artist show counts, maintained by summary.py.
+venue_show_summary = db.Table(
+    "venue_show_summary",
+    db.Column("venue_id", db.Integer, db.ForeignKey("Venue.id"), primary_key=True),
+    db.Column("past_count", db.Integer, nullable=False, default=0),
+    db.Column("upcoming_count", db.Integer, nullable=False, default=0),
+    db.Column("next_show_at", db.DateTime, index=True),
+)
+
+artist_show_summary = db.Table(
+    "artist_show_summary",
+    db.Column("artist_id", db.Integer, db.ForeignKey("Artist.id"), primary_key=True),
+    db.Column("past_count", db.Integer, nullable=False, default=0),
+    db.Column("upcoming_count", db.Integer, nullable=False, default=0),
+    db.Column("next_show_at", db.DateTime, index=True),
+)
+
+
+class Genre(db.Model):
+    __tablename__ = "Genre"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True)
+
+    @classmethod
+    def from_names(cls, names):
+        """Genre rows for ``names``, creating any that do not exist yet."""
+        names = list(dict.fromkeys(names))
+        existing = {
+            genre.name: genre for genre in cls.query.filter(cls.name.in_(names))
+        }
+        return [existing.get(name) or cls(name=name) for name in names]
+
+
 class Venue(db.Model):
     __tablename__ = "Venue"
+    # The /venues pagination order, see views/helpers.py.
+    __table_args__ = (
+        db.Index("ix_Venue_city_state_name_id", "city", "state", "name", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, nullable=False)
     city = db.Column(db.String(120), nullable=False)
-    state = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False, index=True)
     address = db.Column(db.String(120), nullable=False)
     phone = db.Column(db.String(120))
-    genres = db.Column(db.String(120), nullable=False)
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
     website_link = db.Column(db.String(120))
     is_looking_for_talent = db.Column(db.Boolean, default=False)
     seeking_description = db.Column(db.String(300))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    # Also moved forward when the venue's page changes through an edit of
+    # another row, see conditional.touch. Likewise for Artist.
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
+    genres = db.relationship("Genre", secondary=venue_genres, order_by=Genre.name)
+    # Read-only: shows are rows of their own, written through shows_list.
     artists = db.relationship(
-        "Artist", secondary=shows_list, backref=db.backref("venues", lazy=True)
+        "Artist",
+        secondary=shows_list,
+        viewonly=True,
+        backref=db.backref("venues", lazy=True, viewonly=True),
     )
 
 
 class Artist(db.Model):
     __tablename__ = "Artist"
+    # The /artists pagination order, see views/helpers.py.
+    __table_args__ = (db.Index("ix_Artist_name_id", "name", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, nullable=False)
     city = db.Column(db.String(120), nullable=False)
     state = db.Column(db.String(120), nullable=False)
     phone = db.Column(db.String(120))
-    genres = db.Column(db.String(120), nullable=False)
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
     website_link = db.Column(db.String(120))
     is_looking_for_venues = db.Column(db.Boolean, default=False)
     seeking_description = db.Column(db.String(300))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
+    genres = db.relationship("Genre", secondary=artist_genres, order_by=Genre.name)
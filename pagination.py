@@ -0,0 +1,156 @@
+"""Keyset (cursor) pagination for listing and search queries.
+
+A page is fetched by filtering on the sort key of the last row already seen
+instead of using OFFSET, so deep pages cost the same as the first one as long
+as the key is backed by an index. Cursors are opaque url-safe tokens carrying
+the key of the boundary row and the direction to read in.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from flask import abort
+from sqlalchemy import and_, func, literal, or_, tuple_
+from sqlalchemy.types import DateTime
+
+# JSON values a cursor's key may hold.
+SCALARS = (str, int, float, type(None))
+
+
+class Key:
+    """One column of a sort key: result row attribute, SQL expression, order."""
+
+    def __init__(self, name, column, descending=False):
+        self.name = name
+        self.column = column
+        self.descending = descending
+
+    def order(self, reverse=False):
+        if self.descending != reverse:
+            return self.column.desc()
+        return self.column.asc()
+
+    def after(self, value, reverse=False):
+        if self.descending != reverse:
+            return self.column < value
+        return self.column > value
+
+    def at_or_after(self, value, reverse=False):
+        if self.descending != reverse:
+            return self.column <= value
+        return self.column >= value
+
+    def dump(self, value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def load(self, value):
+        if value is not None and isinstance(self.column.type, DateTime):
+            return datetime.fromisoformat(value)
+        return value
+
+
+class Page:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(keys, row, direction):
+    values = [key.dump(getattr(row, key.name)) for key in keys]
+    payload = json.dumps({"d": direction, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(keys, cursor):
+    """Return ``(direction, values)`` or raise ``ValueError``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, values = payload["d"], payload["k"]
+        if (
+            direction not in ("next", "prev")
+            or not isinstance(values, list)
+            or len(values) != len(keys)
+            or not all(isinstance(value, SCALARS) for value in values)
+        ):
+            raise ValueError
+        return direction, [key.load(value) for key, value in zip(keys, values)]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Malformed cursor") from None
+
+
+def _seek(keys, values, reverse):
+    if len({key.descending for key in keys}) == 1:
+        # (a, b, c) > (x, y, z) as a row value, which the planner turns into
+        # a range scan of an index on (a, b, c).
+        columns = tuple_(*(key.column for key in keys))
+        bound = tuple_(*(literal(v, key.column.type) for key, v in zip(keys, values)))
+        if keys[0].descending != reverse:
+            return columns < bound
+        return columns > bound
+    # Mixed directions have no row-value form:
+    # a > x OR (a = x AND (b > y OR (b = y AND c > z))), led by a >= x so the
+    # first key still bounds a range.
+    clause = None
+    for key, value in reversed(list(zip(keys, values))):
+        step = key.after(value, reverse)
+        clause = (
+            step if clause is None else or_(step, and_(key.column == value, clause))
+        )
+    return and_(keys[0].at_or_after(values[0], reverse), clause)
+
+
+def paginate(query, keys, cursor=None, per_page=50):
+    """Fetch one page of ``query`` ordered by ``keys`` starting at ``cursor``.
+
+    Aborts with 400 on a cursor that cannot be decoded.
+    """
+    reverse = False
+    if cursor:
+        try:
+            direction, values = decode_cursor(keys, cursor)
+        except ValueError:
+            abort(400)
+        reverse = direction == "prev"
+        query = query.filter(_seek(keys, values, reverse))
+
+    rows = (
+        query.order_by(*(key.order(reverse) for key in keys)).limit(per_page + 1).all()
+    )
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+    if not rows:
+        return Page(rows)
+
+    # Reading forward, there is a previous page whenever we came from a cursor;
+    # reading backward, there is always the page we came from after this one.
+    has_next = has_more if not reverse else True
+    has_prev = bool(cursor) if not reverse else has_more
+    return Page(
+        rows,
+        next_cursor=encode_cursor(keys, rows[-1], "next") if has_next else None,
+        prev_cursor=encode_cursor(keys, rows[0], "prev") if has_prev else None,
+    )
+
+
+def estimate_count(query, threshold=1000):
+    """Count ``query`` rows, giving up past ``threshold``.
+
+    Returns ``(count, exact)``; once the result set is larger than the
+    threshold only ``threshold`` rows are counted and ``exact`` is False.
+    """
+    capped = query.order_by(None).limit(threshold + 1).subquery()
+    count = query.session.query(func.count()).select_from(capped).scalar()
+    if count > threshold:
+        return threshold, False
+    return count, True
@@ -0,0 +1,131 @@
+"""Detection of N+1 query patterns and per-block query budgets.
+
+Every statement a request executes is fingerprinted (whitespace collapsed,
+literals and expanded ``IN`` lists reduced to a placeholder). When one
+fingerprint runs with more than ``NPLUSONE_THRESHOLD`` distinct parameter sets
+in a single request, that is almost always a query inside a loop: it is
+logged with the view and the application stack that issued it, or raised as
+``NPlusOneError`` when ``NPLUSONE_RAISE`` is set (meant for tests).
+
+Loops that query in deliberate batches, such as the exporter's genre lookups,
+run their statements inside ``batched()``, which N+1 detection skips.
+
+``query_budget`` caps the statements run inside a block, e.g.::
+
+    with query_budget(2):
+        client.get("/venues")
+"""
+
+import contextvars
+import re
+import traceback
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_budgets = contextvars.ContextVar("query_budgets", default=())
+_batched = contextvars.ContextVar("query_batched", default=False)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(statement):
+    """Reduce ``statement`` to its shape, independent of parameter values."""
+    text = _LITERALS.sub("?", statement)
+    text = _PARAMS.sub("?", text)
+    text = _IN_LISTS.sub("(?)", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def _app_stack():
+    # Drop library frames and this module, keep where the application asked.
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-3]
+        if "site-packages" not in frame.filename and frame.filename != __file__
+    ]
+    return "".join(traceback.format_list(frames))
+
+
+class QueryCheck:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["query_check"] = self
+        self.threshold = app.config.get("NPLUSONE_THRESHOLD", 5)
+        self.strict = app.config.get("NPLUSONE_RAISE", False)
+        if not event.contains(Engine, "after_cursor_execute", _after_execute):
+            event.listen(Engine, "after_cursor_execute", _after_execute)
+
+    def observe(self, statement, parameters):
+        seen = g.get("query_shapes")
+        if seen is None:
+            seen = g.query_shapes = defaultdict(set)
+            g.query_shapes_reported = set()
+        shape = fingerprint(statement)
+        params = seen[shape]
+        params.add(repr(parameters))
+        if len(params) <= self.threshold or shape in g.query_shapes_reported:
+            return
+        g.query_shapes_reported.add(shape)
+        message = (
+            f"Possible N+1 in view {request.endpoint!r}: statement ran with "
+            f"{len(params)} different parameter sets: {shape}"
+        )
+        if self.strict:
+            raise NPlusOneError(message)
+        current_app.logger.warning("%s\n%s", message, _app_stack())
+
+
+@contextmanager
+def batched():
+    """Leave the statements of the block out of N+1 detection, for loops that
+    query one batch at a time on purpose. Query budgets still count them.
+    """
+    token = _batched.set(True)
+    try:
+        yield
+    finally:
+        _batched.reset(token)
+
+
+@contextmanager
+def query_budget(limit):
+    """Raise ``QueryBudgetExceeded`` if the block runs more than ``limit``
+    statements. Budgets nest; each one counts everything inside it.
+    """
+    budget = [limit, 0]
+    token = _budgets.set(_budgets.get() + (budget,))
+    try:
+        yield budget
+    finally:
+        _budgets.reset(token)
+    if budget[1] > limit:
+        raise QueryBudgetExceeded(f"{budget[1]} queries run, budget is {limit}")
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    for budget in _budgets.get():
+        budget[1] += 1
+    if (
+        has_request_context()
+        and not _batched.get()
+        and "query_check" in current_app.extensions
+    ):
+        current_app.extensions["query_check"].observe(statement, parameters)
@@ -0,0 +1,154 @@
+"""Read replicas for the read-only pages.
+
+Views marked with ``read_replica`` run their SELECTs on one of the
+``SQLALCHEMY_REPLICA_URIS`` engines. Everything else goes to the primary,
+``SQLALCHEMY_DATABASE_URI``, and so does every write wherever it happens. Once
+a request's session has written it stays on the primary, so it reads back
+what it wrote. The async detail views (``ASYNC_VIEWS``) read through aio.py's
+own engine and are not routed.
+
+Each replica's lag is measured at most every ``REPLICA_CHECK_INTERVAL``
+seconds with ``REPLICA_LAG_QUERY``, by default the replay lag on Postgres;
+other databases report none. Replicas more than ``REPLICA_MAX_LAG`` seconds
+behind, or failing the check, are skipped until the next one, and with none
+left reads go to the primary.
+
+A request that commits a write pins its browser to the primary through the
+session cookie for ``REPLICA_MAX_LAG + REPLICA_CHECK_INTERVAL`` seconds, by
+when any replica still in use has caught up with the write.
+"""
+
+import random
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+
+LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+# Session cookie key: wall-clock time until which the browser reads from the
+# primary.
+PINNED_UNTIL = "_primary_until"
+
+
+def read_replica(view):
+    """Mark ``view`` as read-only: its SELECTs may run on a replica."""
+    view.read_replica = True
+    return view
+
+
+class RoutingSession(Session):
+    """``db.session``: sends the SELECTs of ``read_replica`` views to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and (self._flushing or getattr(clause, "is_dml", False)):
+            self.info["wrote"] = True
+        elif (
+            bind is None
+            and not self.info.get("wrote")
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            replicas = current_app.extensions.get("replicas")
+            engine = replicas.read_engine() if replicas else None
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _committed(db_session):
+    if db_session.info.get("wrote") and has_request_context():
+        g.db_wrote = True
+
+
+class Replica:
+    def __init__(self, url, options):
+        self.engine = create_engine(url, **options)
+        # Seconds behind the primary; None until checked, or if the check failed.
+        self.lag = None
+        self.checked_at = None
+
+
+class Replicas:
+    def __init__(self):
+        self.replicas = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.extensions["replicas"] = self
+        options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        self.replicas = [
+            Replica(url, options)
+            for url in app.config.get("SQLALCHEMY_REPLICA_URIS", ())
+        ]
+        self.max_lag = app.config.get("REPLICA_MAX_LAG", 5)
+        self.interval = app.config.get("REPLICA_CHECK_INTERVAL", 5)
+        self.lag_query = app.config.get("REPLICA_LAG_QUERY")
+        if not event.contains(RoutingSession, "after_commit", _committed):
+            event.listen(RoutingSession, "after_commit", _committed)
+        app.after_request(self._pin)
+
+    def _check(self, replica):
+        query = self.lag_query or LAG_QUERIES.get(replica.engine.dialect.name)
+        try:
+            if query is None:
+                lag = 0.0
+            else:
+                with replica.engine.connect() as connection:
+                    lag = float(connection.execute(text(query)).scalar() or 0)
+        except Exception as e:
+            current_app.logger.warning(
+                "Lag check of replica %s failed: %s", replica.engine.url, e
+            )
+            lag = None
+        replica.lag = lag
+
+    def engine(self):
+        """A replica within the lag tolerance, or ``None``."""
+        now = time.monotonic()
+        for replica in self.replicas:
+            with self._lock:
+                due = (
+                    replica.checked_at is None
+                    or now - replica.checked_at >= self.interval
+                )
+                if due:
+                    replica.checked_at = now
+            # The other workers' threads keep using the previous result.
+            if due:
+                self._check(replica)
+        usable = [
+            replica.engine
+            for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_lag
+        ]
+        return random.choice(usable) if usable else None
+
+    def _reading(self):
+        if not self.replicas or not has_request_context():
+            return False
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, "read_replica", False):
+            return False
+        return session.get(PINNED_UNTIL, 0) <= time.time()
+
+    def read_engine(self):
+        """The replica this request reads from, or ``None`` for the primary."""
+        if not has_request_context():
+            return None
+        if "replica_engine" not in g:
+            g.replica_engine = self.engine() if self._reading() else None
+        return g.replica_engine
+
+    def _pin(self, response):
+        if g.pop("db_wrote", False) and self.replicas:
+            session[PINNED_UNTIL] = time.time() + self.max_lag + self.interval
+        return response
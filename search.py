@@ -0,0 +1,165 @@
+"""Indexed, ranked name search for venues, artists and shows.
+
+Postgres matches against the ``pg_trgm`` GIN indexes on names and the
+``tsvector`` expression indexes over name/city/state created by migrations
+``4b1e2f6c9a10`` and ``9e6f1b2d4c57``. SQLite uses the FTS5 ``venue_search``
+and ``artist_search`` tables from the same migrations, so search behaves the
+same when developing locally. Genres are matched with the indexed genre
+filters on the listing pages instead. Any other engine (or a SQLite database built with
+``db.create_all()``) falls back to a plain ``ILIKE`` on the name.
+"""
+
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import (
+    Double,
+    cast,
+    func,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+
+from models import db, Venue, Artist, shows_list
+from pagination import Key
+
+# pg_trgm and the FTS5 trigram tokenizer cannot use their index for terms
+# shorter than one trigram.
+MIN_INDEXED_LENGTH = 3
+
+DOCUMENT_COLUMNS = ("name", "city", "state")
+
+FTS_TABLES = {Venue: "venue_search", Artist: "artist_search"}
+
+_fts_available = WeakKeyDictionary()
+
+
+def pg_document(tablename):
+    # Must stay identical to the expression indexed by the migration,
+    # otherwise Postgres will not pick the index.
+    parts = " || ' ' || ".join(
+        f"coalesce(\"{tablename}\".{column}, '')" for column in DOCUMENT_COLUMNS
+    )
+    return literal_column(f"to_tsvector('simple'::regconfig, {parts})")
+
+
+def _like_matches(model, term):
+    return select(model.id.label("id"), literal(0.0).label("rank")).where(
+        model.name.icontains(term, autoescape=True)
+    )
+
+
+def _postgres_matches(model, term):
+    document = pg_document(model.__tablename__)
+    query = func.plainto_tsquery(literal_column("'simple'::regconfig"), term)
+    # similarity and ts_rank are real; a cursor carries the rank back as a
+    # JSON double, which a real never equals, so rank as a double to begin with.
+    rank = cast(
+        func.greatest(func.similarity(model.name, term), func.ts_rank(document, query)),
+        Double,
+    )
+    return select(model.id.label("id"), rank.label("rank")).where(
+        or_(
+            model.name.icontains(term, autoescape=True),
+            document.op("@@")(query),
+        )
+    )
+
+
+def _sqlite_matches(model, term):
+    name = FTS_TABLES[model]
+    # A quoted FTS5 string is matched as a substring by the trigram tokenizer.
+    phrase = '"' + term.replace('"', '""') + '"'
+    return (
+        select(
+            literal_column("rowid").label("id"),
+            literal_column(f"-bm25({name})").label("rank"),
+        )
+        .select_from(table(name))
+        .where(literal_column(name).op("MATCH")(phrase))
+    )
+
+
+def _has_fts(bind):
+    engine = bind.engine
+    if engine not in _fts_available:
+        _fts_available[engine] = all(
+            inspect(engine).has_table(name) for name in FTS_TABLES.values()
+        )
+    return _fts_available[engine]
+
+
+def matches(model, term):
+    """Return a ``SELECT id, rank`` of ``model`` rows matching ``term``.
+
+    Higher rank means a better match; an empty term matches every row.
+    """
+    term = term.strip()
+    if not term:
+        return select(model.id.label("id"), literal(0.0).label("rank"))
+    bind = db.session.get_bind()
+    if len(term) >= MIN_INDEXED_LENGTH:
+        if bind.dialect.name == "postgresql":
+            return _postgres_matches(model, term)
+        if bind.dialect.name == "sqlite" and _has_fts(bind):
+            return _sqlite_matches(model, term)
+    return _like_matches(model, term)
+
+
+def result_keys(query, model):
+    """Keyset pagination order for a ``search_venues``/``search_artists`` query."""
+    rank = query.statement.selected_columns["rank"]
+    return (
+        Key("rank", rank, descending=True),
+        Key("name", model.name),
+        Key("id", model.id),
+    )
+
+
+def search_venues(term):
+    """Query of ``(id, name, rank)`` for venues matching ``term``."""
+    hits = matches(Venue, term).subquery()
+    return db.session.query(Venue.id, Venue.name, hits.c.rank).join(
+        hits, hits.c.id == Venue.id
+    )
+
+
+def search_artists(term):
+    """Query of ``(id, name, rank)`` for artists matching ``term``."""
+    hits = matches(Artist, term).subquery()
+    return db.session.query(Artist.id, Artist.name, hits.c.rank).join(
+        hits, hits.c.id == Artist.id
+    )
+
+
+def search_shows(term):
+    """Query of shows whose venue or artist matches ``term``.
+
+    Each side is resolved through its own index and the resulting ids probe
+    ``shows`` by key, instead of OR-ing two leading-wildcard LIKEs over the
+    joined tables.
+    """
+    venue_hits = matches(Venue, term).subquery()
+    artist_hits = matches(Artist, term).subquery()
+    return (
+        db.session.query(
+            shows_list.c.id,
+            Venue.id.label("venue_id"),
+            Venue.name.label("venue_name"),
+            Artist.id.label("artist_id"),
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+            shows_list.c.start_time,
+        )
+        .join(shows_list, Venue.id == shows_list.c.venue_id)
+        .join(Artist, Artist.id == shows_list.c.artist_id)
+        .filter(
+            or_(
+                shows_list.c.venue_id.in_(select(venue_hits.c.id)),
+                shows_list.c.artist_id.in_(select(artist_hits.c.id)),
+            )
+        )
+    )
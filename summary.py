@@ -0,0 +1,184 @@
+"""Per-venue and per-artist show counts, kept next to the ``shows`` table.
+
+``venue_show_summary`` and ``artist_show_summary`` hold each entity's past
+and upcoming show counts and the start of its next upcoming show, so listing
+and search pages read counts by primary key instead of aggregating ``shows``.
+
+Writers keep them current in the same transaction as the change:
+``add_shows`` after inserting shows, ``refresh`` after deleting some and
+``forget`` before deleting the venue or artist itself. Counts
+are split at the time they were last computed, so shows that have started
+since then are still counted as upcoming until ``roll`` recomputes the
+entities whose ``next_show_at`` has passed. ``init_app`` starts a thread in each
+worker, on its first request, that runs ``roll`` every
+``SHOW_SUMMARY_ROLL_INTERVAL`` seconds in its own session, away from the
+requests; ``flask fyyur roll-shows`` does the same from cron.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import case, delete, func, insert, select
+
+from models import db, shows_list, venue_show_summary, artist_show_summary
+from querycheck import batched
+
+SUMMARIES = {"venue": venue_show_summary, "artist": artist_show_summary}
+
+# Ids per IN (...) list when recomputing.
+CHUNK_SIZE = 1000
+
+_roller_lock = threading.Lock()
+# Process the roll thread was started in; a forked worker starts its own.
+_roller_pid = None
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start : start + CHUNK_SIZE]
+
+
+def _upsert(table, key, rows):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        return False
+    statement = upsert(table)
+    new = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[key],
+        set_={
+            "past_count": table.c.past_count + new.past_count,
+            "upcoming_count": table.c.upcoming_count + new.upcoming_count,
+            "next_show_at": case(
+                (table.c.next_show_at.is_(None), new.next_show_at),
+                (new.next_show_at < table.c.next_show_at, new.next_show_at),
+                else_=table.c.next_show_at,
+            ),
+        },
+    )
+    db.session.execute(statement, rows)
+    return True
+
+
+def add_shows(shows, now=None):
+    """Count newly inserted ``shows`` (dicts with ``venue_id``, ``artist_id``
+    and ``start_time``) into the summaries.
+    """
+    now = now or datetime.now()
+    for kind, table in SUMMARIES.items():
+        key = f"{kind}_id"
+        totals = {}
+        for show in shows:
+            row = totals.setdefault(
+                int(show[key]),
+                {key: int(show[key]), "past_count": 0, "upcoming_count": 0},
+            )
+            if show["start_time"] < now:
+                row["past_count"] += 1
+                continue
+            row["upcoming_count"] += 1
+            next_show_at = row.get("next_show_at")
+            if next_show_at is None or show["start_time"] < next_show_at:
+                row["next_show_at"] = show["start_time"]
+        if not totals:
+            continue
+        rows = [{"next_show_at": None, **row} for row in totals.values()]
+        if not _upsert(table, key, rows):
+            refresh(kind, totals, now)
+
+
+def _counts(kind, now):
+    key = shows_list.c[f"{kind}_id"]
+    upcoming = shows_list.c.start_time >= now
+    return select(
+        key,
+        func.count(case((~upcoming, 1))),
+        func.count(case((upcoming, 1))),
+        func.min(case((upcoming, shows_list.c.start_time))),
+    ).group_by(key)
+
+
+def _insert_counts(kind, counts):
+    columns = [f"{kind}_id", "past_count", "upcoming_count", "next_show_at"]
+    db.session.execute(insert(SUMMARIES[kind]).from_select(columns, counts))
+
+
+def refresh(kind, ids, now=None):
+    """Recompute the summaries of ``ids`` from the ``shows`` table."""
+    now = now or datetime.now()
+    table = SUMMARIES[kind]
+    key = f"{kind}_id"
+    with batched():
+        for chunk in _chunks(ids):
+            db.session.execute(delete(table).where(table.c[key].in_(chunk)))
+            counts = _counts(kind, now).where(shows_list.c[key].in_(chunk))
+            _insert_counts(kind, counts)
+
+
+def forget(kind, ids):
+    """Drop the summaries of entities about to be deleted."""
+    table = SUMMARIES[kind]
+    for chunk in _chunks(ids):
+        db.session.execute(delete(table).where(table.c[f"{kind}_id"].in_(chunk)))
+
+
+def rebuild(now=None):
+    """Recompute every summary from scratch."""
+    now = now or datetime.now()
+    for kind, table in SUMMARIES.items():
+        db.session.execute(delete(table))
+        _insert_counts(kind, _counts(kind, now))
+
+
+def roll(now=None):
+    """Recompute the entities whose next show has started; returns how many."""
+    now = now or datetime.now()
+    rolled = 0
+    for kind, table in SUMMARIES.items():
+        ids = db.session.scalars(
+            select(table.c[f"{kind}_id"]).where(table.c.next_show_at <= now)
+        ).all()
+        refresh(kind, ids, now)
+        rolled += len(ids)
+    return rolled
+
+
+def _roll_forever(app, interval):
+    while True:
+        with app.app_context():
+            try:
+                roll()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.warning("Rolling the show summaries failed: %s", e)
+        time.sleep(interval)
+
+
+def _start_roller():
+    global _roller_pid
+    interval = current_app.config.get("SHOW_SUMMARY_ROLL_INTERVAL", 60)
+    if not interval:
+        return
+    with _roller_lock:
+        if _roller_pid == os.getpid():
+            return
+        _roller_pid = os.getpid()
+    threading.Thread(
+        target=_roll_forever,
+        args=(current_app._get_current_object(), interval),
+        name="show-summary-roll",
+        daemon=True,
+    ).start()
+
+
+def init_app(app):
+    app.before_request(_start_roller)
@@ -0,0 +1,32 @@
+"""Template compilation caching.
+
+Jinja compiles a template to Python bytecode the first time a process
+renders it, so each new worker pays for ``layouts/main.html`` and every page
+and form on their first hits. With ``TEMPLATE_CACHE_DIR`` set the compiled
+code is kept there and shared by the workers and across restarts; ``flask
+fyyur warm`` fills it ahead of a deploy. ``TEMPLATE_PRELOAD`` also loads
+every template when the app is created, so no request pays for it.
+"""
+
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+
+def warm(env):
+    """Compile (or load from the bytecode cache) every template ``env`` can
+    find; returns their names.
+    """
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def init_app(app):
+    cache_dir = app.config.get("TEMPLATE_CACHE_DIR")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    if app.config.get("TEMPLATE_PRELOAD"):
+        warm(app.jinja_env)
@@ -0,0 +1,39 @@
+import pytest
+
+from app import create_app
+from models import db, Venue, Artist, Genre
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def add_venue(name, city="San Francisco", state="CA", genres=("Jazz",)):
+    venue = Venue(
+        name=name,
+        city=city,
+        state=state,
+        address="1 Main Street",
+        genres=Genre.from_names(list(genres)),
+    )
+    db.session.add(venue)
+    return venue
+
+
+def add_artist(name, city="Austin", state="TX", genres=("Jazz",)):
+    artist = Artist(
+        name=name, city=city, state=state, genres=Genre.from_names(list(genres))
+    )
+    db.session.add(artist)
+    return artist
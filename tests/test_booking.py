@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from conftest import add_artist, add_venue
+from models import db, shows_list
+import booking
+
+
+def test_tour_reports_ids_in_order_and_rejects_offsets(app):
+    for number in range(3):
+        add_venue(f"Hall {number}")
+    add_artist("Band")
+    db.session.commit()
+
+    with app.test_request_context():
+        reports = booking.book_tour(
+            1,
+            [
+                (3, "2031-01-03T20:00:00"),
+                (1, "2031-01-01T20:00:00+02:00"),
+                (2, "2031-01-02T20:00:00"),
+                (1, "2031-01-01T20:00:00"),
+            ],
+            partial=True,
+        )
+        db.session.commit()
+
+    assert [bool(report["problems"]) for report in reports] == [
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert "has a time zone" in reports[1]["problems"][0]
+    booked = dict(
+        db.session.execute(db.select(shows_list.c.id, shows_list.c.venue_id)).all()
+    )
+    for report in reports:
+        if report["id"] is not None:
+            assert booked[report["id"]] == report["venue_id"]
+    assert (
+        datetime(2031, 1, 1, 20)
+        in db.session.scalars(db.select(shows_list.c.start_time)).all()
+    )
+
+
+def test_show_with_a_time_zone_is_a_problem_not_an_error(app, client):
+    add_venue("Hall")
+    add_artist("Band")
+    db.session.commit()
+
+    response = client.post(
+        "/shows/create",
+        data={"venue_id": 1, "artist_id": 1, "start_time": "2031-01-01T20:00+02:00"},
+    )
+    assert response.status_code == 400
+    with client.session_transaction() as session:
+        messages = [message for _, message in session["_flashes"]]
+    assert "has a time zone" in messages[0]
+    assert "An error occurred. Show could not be listed." not in messages
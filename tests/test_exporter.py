@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from conftest import add_artist, add_venue
+from models import db, Venue, shows_list
+import exporter
+
+
+def test_since_exports_rows_created_or_edited_after_it(app):
+    for number in range(3):
+        add_venue(f"Hall {number}")
+    add_artist("Band")
+    db.session.flush()
+    long_ago = datetime(2020, 1, 1)
+    db.session.execute(
+        db.update(Venue).values(created_at=long_ago, updated_at=long_ago)
+    )
+    db.session.commit()
+    since = datetime.now()
+
+    # An edit of an old venue, and a new show on a past date.
+    db.session.get(Venue, 1).name = "Renamed Hall"
+    db.session.execute(
+        shows_list.insert(),
+        {
+            "venue_id": 2,
+            "artist_id": 1,
+            "start_time": long_ago,
+            "end_time": long_ago + timedelta(hours=2),
+        },
+    )
+    db.session.commit()
+
+    venues = list(exporter.query_rows("venues", since))
+    assert [row[1] for row in venues] == ["Renamed Hall"]
+    assert len(list(exporter.query_rows("shows", since))) == 1
+    assert list(exporter.query_rows("shows", datetime.now())) == []
@@ -0,0 +1,44 @@
+from conftest import add_artist, add_venue
+from models import db, shows_list
+import importer
+
+
+def test_overlapping_show_rows_are_rejected_one_by_one(app):
+    for number in range(2):
+        add_venue(f"Hall {number}")
+        add_artist(f"Band {number}")
+    db.session.commit()
+    rows = [
+        (2, {"venue_id": 1, "artist_id": 1, "start_time": "2030-01-01 20:00:00"}),
+        # Same venue and artist half an hour later.
+        (3, {"venue_id": 1, "artist_id": 1, "start_time": "2030-01-01 20:30:00"}),
+        # Same artist at another venue.
+        (4, {"venue_id": 2, "artist_id": 1, "start_time": "2030-01-01 21:00:00"}),
+        (5, {"venue_id": 2, "artist_id": 2, "start_time": "2030-01-01 20:00:00"}),
+    ]
+    report = importer.load("shows", rows)
+    assert (report.loaded, report.rejected) == (2, 2)
+    assert [line for line, _ in report.errors] == [3, 4]
+
+    # A later import is checked against the shows now booked.
+    report = importer.load(
+        "shows",
+        [(2, {"venue_id": 2, "artist_id": 2, "start_time": "2030-01-01 21:59:00"})],
+    )
+    assert (report.loaded, report.rejected) == (0, 1)
+    assert "venue already has a show at 2030-01-01 20:00" in report.errors[0][1]
+    count = db.session.scalar(db.select(db.func.count()).select_from(shows_list))
+    assert count == 2
+
+
+def test_show_rows_without_a_start_time_are_rejected(app):
+    add_venue("Hall")
+    add_artist("Band")
+    db.session.commit()
+    rows = [
+        (2, {"venue_id": 1, "artist_id": 1}),
+        (3, {"venue_id": 1, "artist_id": 1, "start_time": " "}),
+    ]
+    report = importer.load("shows", rows)
+    assert (report.loaded, report.rejected) == (0, 2)
+    assert report.errors == [(2, "start_time: missing"), (3, "start_time: missing")]
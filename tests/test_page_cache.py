@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app import create_app
+from config import TestingConfig
+from conftest import add_venue
+from models import db, Venue
+
+
+class CachingConfig(TestingConfig):
+    CACHE_BACKEND = "memory"
+
+
+@pytest.fixture
+def app():
+    app = create_app(CachingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_pages_follow_writes_made_by_other_processes(app):
+    add_venue("Old Name")
+    db.session.commit()
+    client = app.test_client()
+    assert b"Old Name" in client.get("/venues/1").data
+    assert b"Old Name" in client.get("/venues/1").data
+
+    # What a write in another worker, or "flask fyyur import", leaves behind:
+    # new data and a newer updated_at, but nothing in this process's cache.
+    db.session.execute(update(Venue).values(name="New Name", updated_at=datetime.now()))
+    db.session.commit()
+
+    assert b"New Name" in client.get("/venues/1").data
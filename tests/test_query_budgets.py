@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import add_artist, add_venue
+from models import db, Venue, shows_list
+from querycheck import NPlusOneError, QueryBudgetExceeded, query_budget
+import exporter
+import summary
+
+
+@pytest.fixture
+def seeded(app):
+    for number in range(3):
+        add_venue(f"Hall {number}", city=("San Francisco", "New York")[number % 2])
+        add_artist(f"Band {number}")
+    db.session.flush()
+    now = datetime.now()
+    db.session.execute(
+        shows_list.insert(),
+        [
+            {
+                "venue_id": venue_id,
+                "artist_id": artist_id,
+                "start_time": now + timedelta(days=venue_id * 3 + artist_id - 6),
+                "end_time": now + timedelta(days=venue_id * 3 + artist_id - 6, hours=2),
+            }
+            for venue_id in (1, 2, 3)
+            for artist_id in (1, 2, 3)
+        ],
+    )
+    summary.rebuild()
+    db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize(
+    "method, path, data, budget",
+    [
+        ("GET", "/venues", None, 2),
+        ("GET", "/artists", None, 2),
+        ("GET", "/shows", None, 2),
+        ("GET", "/venues/1", None, 3),
+        ("GET", "/artists/1", None, 3),
+        ("POST", "/venues/search", {"search_term": "Hall"}, 3),
+        ("POST", "/artists/search", {"search_term": "Band"}, 3),
+        ("POST", "/shows/search", {"search_term": "Hall"}, 3),
+    ],
+)
+def test_query_budgets(seeded, client, method, path, data, budget):
+    # The first search of a process looks up which search indexes exist.
+    client.post("/venues/search", data={"search_term": "warm up"})
+    with query_budget(budget):
+        response = client.open(path, method=method, data=data)
+    assert response.status_code == 200
+
+
+def test_query_budget_is_enforced(seeded, client):
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            client.get("/venues/1")
+
+
+def test_n_plus_one_raises(seeded, client):
+    for number in range(3, 8):
+        add_venue(f"Hall {number}")
+    db.session.commit()
+
+    @seeded.route("/n-plus-one")
+    def n_plus_one():
+        # Lazy-loads each venue's genres in turn: one query per venue.
+        return {venue.name: len(venue.genres) for venue in Venue.query.all()}
+
+    with pytest.raises(NPlusOneError):
+        client.get("/n-plus-one")
+
+
+def test_batched_export_is_not_n_plus_one(seeded):
+    for number in range(3, 15):
+        add_venue(f"Hall {number}")
+    db.session.commit()
+
+    # Seven batches, each with its own genre query.
+    with seeded.test_request_context("/export/venues"):
+        rows = list(exporter.query_rows("venues", batch_size=2))
+    assert len(rows) == 15
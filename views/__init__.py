@@ -0,0 +1 @@
+"""Blueprints for the site's pages, registered by ``app.create_app``."""
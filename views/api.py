@@ -0,0 +1,17 @@
+from flask import Blueprint, abort, jsonify, request
+
+from autocomplete import MODELS
+from extensions import autocomplete
+
+bp = Blueprint("api", __name__, url_prefix="/api")
+
+
+@bp.route("/autocomplete")
+def autocomplete_names():
+    kind = request.args.get("type")
+    if kind not in MODELS:
+        abort(400)
+    matches = autocomplete.search(kind, request.args.get("q", ""))
+    return jsonify(
+        {"results": [{"id": entity_id, "name": name} for entity_id, name in matches]}
+    )
@@ -0,0 +1,273 @@
+from datetime import datetime
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from conditional import conditional, touch
+from extensions import autocomplete, page_cache
+from forms import GENRES, ArtistForm
+from models import db, Artist, Genre, shows_list, artist_genres, artist_show_summary
+from pagination import estimate_count, paginate
+from replicas import read_replica
+from views.helpers import (
+    ARTIST_KEYS,
+    artist_shows,
+    genre_names,
+    seconds_until_next_show,
+    split_shows,
+    upcoming_show_counts,
+    with_genre,
+)
+import search
+
+bp = Blueprint("artists", __name__)
+
+
+@bp.route("/artists")
+@read_replica
+def artists():
+    rows = db.session.query(Artist.id, Artist.name)
+    genre = request.args.get("genre") or None
+    if genre:
+        rows = rows.filter(Artist.id.in_(with_genre(artist_genres.c.artist_id, genre)))
+    artists = paginate(
+        rows, ARTIST_KEYS, request.args.get("cursor"), current_app.config["PAGE_SIZE"]
+    )
+    return render_template(
+        "pages/artists.html",
+        artists=artists,
+        page=artists,
+        genres=GENRES,
+        genre=genre,
+    )
+
+
+@bp.route("/artists/search", methods=["GET", "POST"])
+@read_replica
+def search_artists():
+    search_term = request.values.get("search_term", "")
+    matches = search.search_artists(search_term)
+    artists = paginate(
+        matches,
+        search.result_keys(matches, Artist),
+        request.values.get("cursor"),
+        current_app.config["PAGE_SIZE"],
+    )
+    count, count_exact = estimate_count(
+        matches, current_app.config["SEARCH_COUNT_THRESHOLD"]
+    )
+    counts = upcoming_show_counts(artist_show_summary, [a.id for a in artists])
+    data = [
+        {
+            "id": artist.id,
+            "name": artist.name,
+            "num_upcoming_shows": counts.get(artist.id, 0),
+        }
+        for artist in artists
+    ]
+    response = {
+        "count": count,
+        "count_exact": count_exact,
+        "data": data,
+    }
+    return render_template(
+        "pages/search_artists.html",
+        results=response,
+        page=artists,
+        search_term=search_term,
+    )
+
+
+@bp.route("/artists/<int:artist_id>")
+@read_replica
+@conditional("artist")
+def show_artist(artist_id):
+    cache_key = page_cache.key("artist", artist_id)
+    page = page_cache.get(cache_key)
+    if page is not None:
+        return page
+
+    artist_display = Artist.query.options(joinedload(Artist.genres)).get(artist_id)
+    shows = db.session.execute(artist_shows(artist_id)).all()
+    genres = [genre.name for genre in artist_display.genres]
+    return render_artist_page(cache_key, artist_display, genres, shows)
+
+
+@conditional("artist")
+async def show_artist_concurrent(artist_id):
+    # ASYNC_VIEWS: the artist, its genres and its shows are fetched at once.
+    cache_key = page_cache.key("artist", artist_id)
+    page = page_cache.get(cache_key)
+    if page is not None:
+        return page
+
+    import aio
+
+    artists, genres, shows = await aio.fetch_all(
+        select(Artist.__table__).where(Artist.id == artist_id),
+        genre_names(artist_genres.c.artist_id, artist_id),
+        artist_shows(artist_id),
+    )
+    if not artists:
+        abort(404)
+    return render_artist_page(cache_key, artists[0], [name for name, in genres], shows)
+
+
+@bp.record
+def use_async_views(state):
+    if state.app.config["ASYNC_VIEWS"]:
+        state.app.view_functions["artists.show_artist"] = show_artist_concurrent
+
+
+def render_artist_page(cache_key, artist_display, genres, shows):
+    now = datetime.now()
+    past_shows, upcoming_shows = split_shows(shows, now)
+    data = {
+        "id": artist_display.id,
+        "name": artist_display.name,
+        "genres": genres,
+        "city": artist_display.city,
+        "state": artist_display.state,
+        "phone": artist_display.phone,
+        "website": artist_display.website_link,
+        "facebook_link": artist_display.facebook_link,
+        "seeking_venue": artist_display.is_looking_for_venues,
+        "seeking_description": artist_display.seeking_description,
+        "image_link": artist_display.image_link,
+        "past_shows": [
+            {
+                "venue_id": show.venue_id,
+                "venue_name": show.venue_name,
+                "venue_image_link": show.venue_image_link,
+                "start_time": show.start_time,
+            }
+            for show in past_shows
+        ],
+        "upcoming_shows": [
+            {
+                "venue_id": show.venue_id,
+                "venue_name": show.venue_name,
+                "venue_image_link": show.venue_image_link,
+                "start_time": show.start_time,
+            }
+            for show in upcoming_shows
+        ],
+        "past_shows_count": len(past_shows),
+        "upcoming_shows_count": len(upcoming_shows),
+    }
+
+    page = render_template("pages/show_artist.html", artist=data)
+    page_cache.set(cache_key, page, seconds_until_next_show(upcoming_shows, now))
+    return page
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route("/artists/create", methods=["GET"])
+def create_artist_form():
+    form = ArtistForm()
+    return render_template("forms/new_artist.html", form=form)
+
+
+@bp.route("/artists/create", methods=["POST"])
+def create_artist_submission():
+    error = False
+    try:
+        artist = Artist(
+            name=request.form["name"],
+            city=request.form["city"],
+            state=request.form["state"],
+            phone=request.form["phone"],
+            genres=Genre.from_names(request.form.getlist("genres")),
+            facebook_link=request.form["facebook_link"],
+            image_link=request.form["image_link"],
+            website_link=request.form["website_link"],
+            is_looking_for_venues=True if "seeking_venue" in request.form else False,
+            seeking_description=request.form["seeking_description"],
+        )
+        db.session.add(artist)
+        db.session.flush()
+        artist_id = artist.id
+        db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        flash(
+            "An error occurred. Artist "
+            + request.form["name"]
+            + " could not be listed."
+        )
+        abort(400)
+    autocomplete.add("artist", artist_id, request.form["name"])
+    flash("Artist " + request.form["name"] + " was successfully listed!")
+    return render_template("pages/home.html")
+
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@bp.route("/artists/<int:artist_id>/edit", methods=["GET"])
+def edit_artist(artist_id):
+    artist = Artist.query.options(joinedload(Artist.genres)).get(artist_id)
+    form = ArtistForm(obj=artist)
+    form.genres.data = [genre.name for genre in artist.genres]
+    form.seeking_venue.data = artist.is_looking_for_venues
+    return render_template("forms/edit_artist.html", form=form, artist=artist)
+
+
+@bp.route("/artists/<int:artist_id>/edit", methods=["POST"])
+def edit_artist_submission(artist_id):
+    error = False
+    try:
+        artist = Artist.query.get(artist_id)
+        artist.name = request.form["name"]
+        artist.city = request.form["city"]
+        artist.state = request.form["state"]
+        artist.phone = request.form["phone"]
+        artist.genres = Genre.from_names(request.form.getlist("genres"))
+        artist.facebook_link = request.form["facebook_link"]
+        artist.image_link = request.form["image_link"]
+        artist.website_link = request.form["website_link"]
+        artist.is_looking_for_venues = (
+            True if "seeking_venue" in request.form else False
+        )
+        artist.seeking_description = request.form["seeking_description"]
+        venue_ids = [
+            row.venue_id
+            for row in db.session.query(shows_list.c.venue_id)
+            .filter(shows_list.c.artist_id == artist_id)
+            .distinct()
+        ]
+        # Genre-only edits do not update the row by themselves.
+        artist.updated_at = datetime.now()
+        touch("venue", venue_ids, artist.updated_at)
+
+        db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        flash("An error occurred. Artist could not be updated.")
+        abort(400)
+    autocomplete.add("artist", artist_id, request.form["name"])
+    return redirect(url_for("artists.show_artist", artist_id=artist_id))
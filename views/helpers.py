@@ -0,0 +1,97 @@
+"""Query builders and small helpers shared by the view modules."""
+
+from sqlalchemy import select
+
+from models import db, Venue, Artist, Genre, shows_list
+from pagination import Key
+
+
+def upcoming_show_counts(summary_table, ids):
+    """Map each id in ``ids`` to its number of upcoming shows.
+
+    ``summary_table`` is ``venue_show_summary`` or ``artist_show_summary``;
+    the counts are read by primary key in one query.
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+    key = summary_table.c[0]
+    rows = db.session.query(key, summary_table.c.upcoming_count).filter(key.in_(ids))
+    return dict(rows.all())
+
+
+def with_genre(id_column, genre):
+    """``SELECT id_column`` of a genre association table, for one genre name."""
+    return (
+        select(id_column)
+        .join(Genre, Genre.id == id_column.table.c.genre_id)
+        .where(Genre.name == genre)
+    )
+
+
+def split_shows(shows, now):
+    """Split rows ordered by ``start_time`` into ``(past, upcoming)`` at ``now``."""
+    boundary = len(shows)
+    for index, show in enumerate(shows):
+        if show.start_time >= now:
+            boundary = index
+            break
+    return shows[:boundary], shows[boundary:]
+
+
+def seconds_until_next_show(upcoming_shows, now):
+    """Lifetime of a cached page: until its first upcoming show starts."""
+    if not upcoming_shows:
+        return None
+    return (upcoming_shows[0].start_time - now).total_seconds()
+
+
+def venue_shows(venue_id):
+    """A venue's shows with their artists, ordered by start time."""
+    return (
+        select(
+            Artist.id.label("artist_id"),
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+            shows_list.c.start_time,
+        )
+        .join(shows_list, Artist.id == shows_list.c.artist_id)
+        .where(shows_list.c.venue_id == venue_id)
+        .order_by(shows_list.c.start_time)
+    )
+
+
+def artist_shows(artist_id):
+    """An artist's shows with their venues, ordered by start time."""
+    return (
+        select(
+            Venue.id.label("venue_id"),
+            Venue.name.label("venue_name"),
+            Venue.image_link.label("venue_image_link"),
+            shows_list.c.start_time,
+        )
+        .join(shows_list, Venue.id == shows_list.c.venue_id)
+        .where(shows_list.c.artist_id == artist_id)
+        .order_by(shows_list.c.start_time)
+    )
+
+
+def genre_names(id_column, entity_id):
+    """Names of the genres linked to ``entity_id`` through ``id_column``."""
+    return (
+        select(Genre.name)
+        .join(id_column.table, Genre.id == id_column.table.c.genre_id)
+        .where(id_column == entity_id)
+        .order_by(Genre.name)
+    )
+
+
+# Keyset pagination orders; each must end in a unique column.
+VENUE_AREA_KEYS = (
+    Key("city", Venue.city),
+    Key("state", Venue.state),
+    Key("name", Venue.name),
+    Key("id", Venue.id),
+)
+ARTIST_KEYS = (Key("name", Artist.name), Key("id", Artist.id))
+SHOW_KEYS = (Key("start_time", shows_list.c.start_time), Key("id", shows_list.c.id))
@@ -0,0 +1,55 @@
+from flask import Blueprint, abort, current_app, render_template, request
+from flask import stream_with_context
+
+from replicas import read_replica
+
+bp = Blueprint("main", __name__)
+
+
+@bp.route("/")
+def index():
+    return render_template("pages/home.html")
+
+
+#  Export
+#  ----------------------------------------------------------------
+
+
+@bp.route("/export/<kind>")
+@read_replica
+def export(kind):
+    import exporter
+
+    if kind not in exporter.COLUMNS:
+        abort(404)
+    format = request.args.get("format", "csv")
+    if format not in exporter.MIMETYPES:
+        abort(400)
+    since = request.args.get("since")
+    if since:
+        try:
+            since = exporter.parse_since(since)
+        except ValueError:
+            abort(400)
+    compress = request.args.get("gzip") == "1"
+
+    filename = f"{kind}.{format}"
+    mimetype = exporter.MIMETYPES[format]
+    if compress:
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return current_app.response_class(
+        stream_with_context(exporter.export(kind, format, since or None, compress)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template("errors/404.html"), 404
+
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template("errors/500.html"), 500
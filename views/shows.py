@@ -0,0 +1,215 @@
+from datetime import datetime
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    render_template,
+    request,
+    stream_template,
+)
+
+from forms import ShowForm, TourForm
+from models import db, Venue, Artist, shows_list
+from pagination import estimate_count, paginate
+from replicas import read_replica
+from views.helpers import SHOW_KEYS
+import booking
+import search
+import summary
+
+bp = Blueprint("shows", __name__)
+
+
+@bp.route("/shows")
+@read_replica
+def shows():
+    shows = (
+        db.session.query(
+            shows_list.c.id,
+            Venue.id.label("venue_id"),
+            Venue.name.label("venue_name"),
+            Artist.id.label("artist_id"),
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+            shows_list.c.start_time,
+        )
+        .join(shows_list, Venue.id == shows_list.c.venue_id)
+        .join(Artist, Artist.id == shows_list.c.artist_id)
+    )
+    if request.args.get("view") == "all":
+        # Stream the whole listing: rows come off a server-side cursor in
+        # batches and go straight into the template as it renders.
+        rows = shows.order_by(*(key.order() for key in SHOW_KEYS)).yield_per(
+            current_app.config["STREAM_BATCH_SIZE"]
+        )
+        return stream_template("pages/shows.html", shows=rows, page=None)
+
+    shows = paginate(
+        shows, SHOW_KEYS, request.args.get("cursor"), current_app.config["PAGE_SIZE"]
+    )
+
+    data = []
+    for show in shows:
+        data.append(
+            {
+                "venue_id": show.venue_id,
+                "venue_name": show.venue_name,
+                "artist_id": show.artist_id,
+                "artist_name": show.artist_name,
+                "artist_image_link": show.artist_image_link,
+                "start_time": show.start_time,
+            }
+        )
+    return render_template("pages/shows.html", shows=data, page=shows)
+
+
+@bp.route("/shows/search", methods=["GET", "POST"])
+@read_replica
+def search_shows():
+    search_term = request.values.get("search_term", "")
+    matches = search.search_shows(search_term)
+    shows = paginate(
+        matches,
+        SHOW_KEYS,
+        request.values.get("cursor"),
+        current_app.config["PAGE_SIZE"],
+    )
+    count, count_exact = estimate_count(
+        matches, current_app.config["SEARCH_COUNT_THRESHOLD"]
+    )
+    data = []
+    for show in shows:
+        data.append(
+            {
+                "venue_id": show.venue_id,
+                "venue_name": show.venue_name,
+                "artist_id": show.artist_id,
+                "artist_name": show.artist_name,
+                "artist_image_link": show.artist_image_link,
+                "start_time": show.start_time,
+            }
+        )
+    response = {
+        "count": count,
+        "count_exact": count_exact,
+        "data": data,
+    }
+    return render_template(
+        "pages/search_shows.html",
+        results=response,
+        page=shows,
+        search_term=search_term,
+    )
+
+
+@bp.route("/shows/create")
+def create_shows():
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template("forms/new_show.html", form=form)
+
+
+@bp.route("/shows/create", methods=["POST"])
+def create_show_submission():
+    import dateutil.parser
+
+    error = False
+    problems = []
+    try:
+        start_time = dateutil.parser.parse(request.form["start_time"])
+        show = {
+            "venue_id": int(request.form["venue_id"]),
+            "artist_id": int(request.form["artist_id"]),
+            "start_time": start_time,
+            "end_time": start_time + booking.show_duration(),
+        }
+        problems = booking.check_start_time(start_time) or booking.check_show(show)
+        if not problems:
+            db.session.execute(shows_list.insert(), show)
+            summary.add_shows([show])
+            db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        flash("An error occurred. Show could not be listed.")
+        abort(400)
+    if problems:
+        for problem in problems:
+            flash(problem)
+        flash("Show could not be listed.")
+        abort(400)
+    flash("Show was successfully listed!")
+    return render_template("pages/home.html")
+
+
+@bp.route("/shows/tour")
+def create_tour():
+    form = TourForm()
+    return render_template("forms/new_tour.html", form=form, reports=None)
+
+
+def _tour_request():
+    """``(artist_id, dates, partial)`` from a JSON body or the tour form."""
+    if request.is_json:
+        body = request.get_json()
+        dates = [
+            (show.get("venue_id"), show.get("start_time")) for show in body["shows"]
+        ]
+        return body["artist_id"], dates, body.get("mode") == "partial"
+    dates = []
+    for line in request.form["dates"].splitlines():
+        if line.strip():
+            venue_id, _, start_time = line.partition(",")
+            dates.append((venue_id.strip(), start_time.strip()))
+    return request.form["artist_id"], dates, request.form.get("mode") == "partial"
+
+
+@bp.route("/shows/tour", methods=["POST"])
+def create_tour_submission():
+    try:
+        artist_id, dates, partial = _tour_request()
+        artist_id = int(artist_id)
+    except Exception:
+        abort(400)
+    if not dates or len(dates) > current_app.config["TOUR_MAX_SHOWS"]:
+        abort(400)
+
+    error = False
+    try:
+        reports = booking.book_tour(artist_id, dates, partial)
+        booked = [report for report in reports if report["id"] is not None]
+        if booked:
+            summary.add_shows([{**report, "artist_id": artist_id} for report in booked])
+            db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        if not request.is_json:
+            flash("An error occurred. The tour could not be listed.")
+        abort(400)
+    status = 200 if booked else 400
+
+    if request.is_json:
+        for report in reports:
+            if isinstance(report["start_time"], datetime):
+                report["start_time"] = report["start_time"].isoformat()
+        return jsonify({"booked": len(booked), "shows": reports}), status
+    if booked:
+        flash(f"{len(booked)} of {len(reports)} shows were successfully listed!")
+    else:
+        flash("The tour could not be listed.")
+    return (
+        render_template("forms/new_tour.html", form=TourForm(), reports=reports),
+        status,
+    )
@@ -0,0 +1,352 @@
+from datetime import datetime
+from itertools import groupby
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import joinedload
+
+from conditional import conditional, touch
+from extensions import autocomplete, page_cache
+from forms import GENRES, STATES, VenueForm
+from models import db, Venue, Genre, shows_list, venue_genres, venue_show_summary
+from pagination import estimate_count, paginate
+from replicas import read_replica
+from views.helpers import (
+    VENUE_AREA_KEYS,
+    genre_names,
+    seconds_until_next_show,
+    split_shows,
+    upcoming_show_counts,
+    venue_shows,
+    with_genre,
+)
+import search
+import summary
+
+bp = Blueprint("venues", __name__)
+
+
+@bp.route("/venues")
+@read_replica
+def venues():
+    # Each venue with its summarized upcoming show count, already ordered by
+    # area so consecutive rows can be folded into (city, state).
+    rows = db.session.query(
+        Venue.id,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+        func.coalesce(venue_show_summary.c.upcoming_count, 0).label(
+            "num_upcoming_shows"
+        ),
+    ).outerjoin(venue_show_summary, Venue.id == venue_show_summary.c.venue_id)
+    genre = request.args.get("genre") or None
+    state = request.args.get("state") or None
+    if genre:
+        rows = rows.filter(Venue.id.in_(with_genre(venue_genres.c.venue_id, genre)))
+    if state:
+        rows = rows.filter(Venue.state == state)
+    page = paginate(
+        rows,
+        VENUE_AREA_KEYS,
+        request.args.get("cursor"),
+        current_app.config["PAGE_SIZE"],
+    )
+
+    areas = []
+    for (area_city, area_state), area_rows in groupby(
+        page, key=lambda row: (row.city, row.state)
+    ):
+        areas.append(
+            {
+                "city": area_city,
+                "state": area_state,
+                "venues": [
+                    {
+                        "id": row.id,
+                        "name": row.name,
+                        "num_upcoming_shows": row.num_upcoming_shows,
+                    }
+                    for row in area_rows
+                ],
+            }
+        )
+    return render_template(
+        "pages/venues.html",
+        areas=areas,
+        page=page,
+        genres=GENRES,
+        states=STATES,
+        genre=genre,
+        state=state,
+    )
+
+
+@bp.route("/venues/search", methods=["GET", "POST"])
+@read_replica
+def search_venues():
+    search_term = request.values.get("search_term", "")
+    matches = search.search_venues(search_term)
+    venues = paginate(
+        matches,
+        search.result_keys(matches, Venue),
+        request.values.get("cursor"),
+        current_app.config["PAGE_SIZE"],
+    )
+    count, count_exact = estimate_count(
+        matches, current_app.config["SEARCH_COUNT_THRESHOLD"]
+    )
+    counts = upcoming_show_counts(venue_show_summary, [v.id for v in venues])
+    data = [
+        {
+            "id": venue.id,
+            "name": venue.name,
+            "num_upcoming_shows": counts.get(venue.id, 0),
+        }
+        for venue in venues
+    ]
+    response = {
+        "count": count,
+        "count_exact": count_exact,
+        "data": data,
+    }
+    return render_template(
+        "pages/search_venues.html",
+        results=response,
+        page=venues,
+        search_term=search_term,
+    )
+
+
+@bp.route("/venues/<int:venue_id>")
+@read_replica
+@conditional("venue")
+def show_venue(venue_id):
+    cache_key = page_cache.key("venue", venue_id)
+    page = page_cache.get(cache_key)
+    if page is not None:
+        return page
+
+    display_venue = Venue.query.options(joinedload(Venue.genres)).get(venue_id)
+    shows = db.session.execute(venue_shows(venue_id)).all()
+    genres = [genre.name for genre in display_venue.genres]
+    return render_venue_page(cache_key, display_venue, genres, shows)
+
+
+@conditional("venue")
+async def show_venue_concurrent(venue_id):
+    # ASYNC_VIEWS: the venue, its genres and its shows are fetched at once.
+    cache_key = page_cache.key("venue", venue_id)
+    page = page_cache.get(cache_key)
+    if page is not None:
+        return page
+
+    import aio
+
+    venues, genres, shows = await aio.fetch_all(
+        select(Venue.__table__).where(Venue.id == venue_id),
+        genre_names(venue_genres.c.venue_id, venue_id),
+        venue_shows(venue_id),
+    )
+    if not venues:
+        abort(404)
+    return render_venue_page(cache_key, venues[0], [name for name, in genres], shows)
+
+
+@bp.record
+def use_async_views(state):
+    if state.app.config["ASYNC_VIEWS"]:
+        state.app.view_functions["venues.show_venue"] = show_venue_concurrent
+
+
+def render_venue_page(cache_key, display_venue, genres, shows):
+    now = datetime.now()
+    past_shows, upcoming_shows = split_shows(shows, now)
+
+    data = {
+        "id": display_venue.id,
+        "name": display_venue.name,
+        "genres": genres,
+        "address": display_venue.address,
+        "city": display_venue.city,
+        "state": display_venue.state,
+        "phone": display_venue.phone,
+        "website": display_venue.website_link,
+        "facebook_link": display_venue.facebook_link,
+        "seeking_talent": display_venue.is_looking_for_talent,
+        "seeking_description": display_venue.seeking_description,
+        "image_link": display_venue.image_link,
+        "past_shows": [
+            {
+                "artist_id": show.artist_id,
+                "artist_name": show.artist_name,
+                "artist_image_link": show.artist_image_link,
+                "start_time": show.start_time,
+            }
+            for show in past_shows
+        ],
+        "upcoming_shows": [
+            {
+                "artist_id": show.artist_id,
+                "artist_name": show.artist_name,
+                "artist_image_link": show.artist_image_link,
+                "start_time": show.start_time,
+            }
+            for show in upcoming_shows
+        ],
+        "past_shows_count": len(past_shows),
+        "upcoming_shows_count": len(upcoming_shows),
+    }
+
+    page = render_template("pages/show_venue.html", venue=data)
+    page_cache.set(cache_key, page, seconds_until_next_show(upcoming_shows, now))
+    return page
+
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route("/venues/create", methods=["GET"])
+def create_venue_form():
+    form = VenueForm()
+    return render_template("forms/new_venue.html", form=form)
+
+
+@bp.route("/venues/create", methods=["POST"])
+def create_venue_submission():
+    error = False
+    try:
+        venue = Venue(
+            name=request.form["name"],
+            city=request.form["city"],
+            state=request.form["state"],
+            address=request.form["address"],
+            phone=request.form["phone"],
+            genres=Genre.from_names(request.form.getlist("genres")),
+            facebook_link=request.form["facebook_link"],
+            image_link=request.form["image_link"],
+            website_link=request.form["website_link"],
+            is_looking_for_talent=True if "seeking_talent" in request.form else False,
+            seeking_description=request.form["seeking_description"],
+        )
+        db.session.add(venue)
+        db.session.flush()
+        venue_id = venue.id
+        db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        flash(
+            "An error occurred. Venue " + request.form["name"] + " could not be listed."
+        )
+        abort(400)
+    else:
+        autocomplete.add("venue", venue_id, request.form["name"])
+        flash("Venue " + request.form["name"] + " was successfully listed!")
+    return render_template("pages/home.html")
+
+
+@bp.route("/venues/<venue_id>", methods=["DELETE"])
+def delete_venue(venue_id):
+    error = False
+    try:
+        venue = Venue.query.get(venue_id)
+        artist_ids = [
+            row.artist_id
+            for row in db.session.query(shows_list.c.artist_id)
+            .filter(shows_list.c.venue_id == venue_id)
+            .distinct()
+        ]
+        summary.forget("venue", [venue.id])
+        db.session.execute(delete(shows_list).where(shows_list.c.venue_id == venue.id))
+        db.session.delete(venue)
+        db.session.flush()
+        summary.refresh("artist", artist_ids)
+        touch("artist", artist_ids)
+        db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        flash(
+            "An error occurred. Venue "
+            + request.form["name"]
+            + " could not be deleted."
+        )
+        abort(400)
+    else:
+        autocomplete.remove("venue", int(venue_id))
+        flash("Venue " + venue_id + " was successfully deleted!")
+    return jsonify({"success": True})
+
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@bp.route("/venues/<int:venue_id>/edit", methods=["GET"])
+def edit_venue(venue_id):
+    venue = Venue.query.options(joinedload(Venue.genres)).get(venue_id)
+    form = VenueForm(obj=venue)
+    form.genres.data = [genre.name for genre in venue.genres]
+    form.seeking_talent.data = venue.is_looking_for_talent
+    return render_template("forms/edit_venue.html", form=form, venue=venue)
+
+
+@bp.route("/venues/<int:venue_id>/edit", methods=["POST"])
+def edit_venue_submission(venue_id):
+    error = False
+    try:
+        venue = Venue.query.get(venue_id)
+        venue.name = request.form["name"]
+        venue.city = request.form["city"]
+        venue.state = request.form["state"]
+        venue.phone = request.form["phone"]
+        venue.genres = Genre.from_names(request.form.getlist("genres"))
+        venue.facebook_link = request.form["facebook_link"]
+        venue.image_link = request.form["image_link"]
+        venue.website_link = request.form["website_link"]
+        venue.is_looking_for_talent = (
+            True if "seeking_talent" in request.form else False
+        )
+        venue.seeking_description = request.form["seeking_description"]
+        artist_ids = [
+            row.artist_id
+            for row in db.session.query(shows_list.c.artist_id)
+            .filter(shows_list.c.venue_id == venue_id)
+            .distinct()
+        ]
+        # Genre-only edits do not update the row by themselves.
+        venue.updated_at = datetime.now()
+        touch("artist", artist_ids, venue.updated_at)
+
+        db.session.commit()
+    except Exception as e:
+        error = True
+        db.session.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.session.close()
+    if error:
+        flash("An error occurred. Venue could not be updated.")
+        abort(400)
+    autocomplete.add("venue", venue_id, request.form["name"])
+    return redirect(url_for("venues.show_venue", venue_id=venue_id))